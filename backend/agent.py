@@ -33,6 +33,7 @@ from backend.config import (
   RATE_LIMIT_DELAY_MULTIPLIER,
   RATE_LIMIT_WINDOW_SECONDS,
   RETRY_ATTEMPTS_MULTIPLIER,
+  SEARCH_BATCH_SIZE,
 )
 from backend.database import check_figure_exists, save_figure
 from backend.gemini import make_gemini_lm
@@ -208,6 +209,18 @@ def sample_demographic_combinations(
   combinations = set()
   samples = []
 
+  # Attribute-count distribution (favor smaller combinations)
+  # Uses exponential decay: P(n) ∝ exp(-λ * (n-2)) for n >= 2
+  # This naturally favors smaller values and scales to any max_n
+  # Always uses at least MIN_ATTRIBUTES_PER_COMBO attributes (unless only 1 exists)
+  # Depends only on len(options), so it is built once rather than per attempt
+  max_n = len(options)
+  if max_n > 1:
+    n_values = np.arange(MIN_ATTRIBUTES_PER_COMBO, max_n + 1)
+    weights = np.exp(-DECAY_RATE * (n_values - MIN_ATTRIBUTES_PER_COMBO))
+    n_choices = n_values.tolist()
+    n_cum_weights = np.cumsum(weights).tolist()
+
   # Sample with retries to get diverse combinations
   max_attempts = num_attribution_combinations * RETRY_ATTEMPTS_MULTIPLIER
   attempts = 0
@@ -215,18 +228,13 @@ def sample_demographic_combinations(
   while len(samples) < num_attribution_combinations and attempts < max_attempts:
     attempts += 1
 
-    # Sample number of attributes (favor smaller combinations)
-    # Uses exponential decay: P(n) ∝ exp(-λ * (n-2)) for n >= 2
-    # This naturally favors smaller values and scales to any max_n
-    # Always uses at least MIN_ATTRIBUTES_PER_COMBO attributes (unless only 1 exists)
-    max_n = len(options)
+    # Sample number of attributes from the precomputed distribution;
+    # random.choices with cumulative weights avoids the per-call numpy
+    # dispatch of np.random.choice
     if max_n == 1:
       n_attributes = 1
     else:
-      n_values = np.arange(MIN_ATTRIBUTES_PER_COMBO, max_n + 1)
-      weights = np.exp(-DECAY_RATE * (n_values - MIN_ATTRIBUTES_PER_COMBO))
-      probabilities = weights / weights.sum()
-      n_attributes = np.random.choice(n_values, p=probabilities)
+      n_attributes = random.choices(n_choices, cum_weights=n_cum_weights, k=1)[0]
 
     # Sample M attribute pairs (without replacement)
     selected_pairs = random.sample(options, n_attributes)
@@ -550,6 +558,36 @@ class FindFiguresWithGoogleSearch(dspy.Signature):
   )
 
 
+class FindFiguresForDemographicsBatch(dspy.Signature):
+  """Search for forgotten historical figures for SEVERAL demographic combinations at once.
+
+  Use Google Search to find historical figures from marginalized backgrounds.
+  You are a cultural historian specializing in overlooked narratives.
+  The input lists numbered demographic combinations; answer each one
+  independently, on its own line.
+
+  CRITICAL: Return ONLY the full legal names of real historical people.
+  """
+
+  demographic_blocks = dspy.InputField(
+    desc=(
+      "Numbered demographic combinations, one per line, e.g. "
+      "'1. Mexican, neuroscience' / '2. Black, gay, civil rights'"
+    )
+  )
+  goals_context = dspy.InputField(
+    desc="Goals and aspirations context to help match relevant figures"
+  )
+  limit = dspy.InputField(desc="Maximum number of figures per combination")
+  figure_names_per_block = dspy.OutputField(
+    desc=(
+      "One line per combination, formatted as '<number>: Name|Name|Name'. "
+      "Example: '1: Marie Curie|Ada Lovelace'. NO descriptions, NO titles, "
+      "ONLY names like 'Firstname Lastname'."
+    )
+  )
+
+
 # --- Helpers for Search ---
 
 
@@ -725,6 +763,90 @@ def search_figures_for_demographic_gemini(
   return names
 
 
+def _parse_batch_names(raw: str) -> List[str]:
+  """Clean and validate one combination's pipe-separated name list."""
+  names = []
+  for part in raw.split("|"):
+    cleaned = clean_name(re.sub(r"^\d+\.\s*", "", part).strip())
+    if not cleaned or not is_valid_person_name(cleaned):
+      continue
+    if len(cleaned) > MAX_NAME_LENGTH:
+      continue
+    words = cleaned.split()
+    if len(words) < MIN_WORDS_IN_NAME or len(words) > MAX_WORDS_IN_NAME:
+      continue
+    names.append(cleaned)
+  return names
+
+
+def search_figures_for_demographics_batch(
+  combos: List[Tuple[str, Dict[str, str]]],
+  goals: Optional[List[str]] = None,
+  limit: int = FIGURES_PER_SEARCH,
+  lm=None,
+  batch_size: int = SEARCH_BATCH_SIZE,
+) -> List[List[str]]:
+  """Search for figures for several demographic combinations per LLM call.
+
+  Packs up to batch_size combinations into one prompt as numbered blocks, so
+  the shared instructions are paid once per batch instead of once per
+  combination, and N API round-trips collapse to ceil(N / batch_size).
+
+  Args:
+      combos: (demographic_string, demographic_dict) tuples, as produced by
+          sample_demographic_combinations
+      goals: User's goals/aspirations for context
+      limit: Max figures to return per combination
+      lm: Language model to use
+      batch_size: Combinations per prompt
+
+  Returns:
+      One list of valid figure names per combination, in input order
+  """
+  if not combos:
+    return []
+
+  goals_str = ", ".join(goals) if goals else "their goals and aspirations"
+  searcher = dspy.Predict(
+    FindFiguresForDemographicsBatch,
+    tools=[{"googleSearch": {}}],
+  )
+
+  results: List[List[str]] = [[] for _ in combos]
+
+  for start in range(0, len(combos), batch_size):
+    chunk = combos[start : start + batch_size]
+    blocks = "\n".join(f"{i + 1}. {demo_str}" for i, (demo_str, _) in enumerate(chunk))
+
+    print("\n" + "=" * 30)
+    print(f"Batched Gemini+Google search for {len(chunk)} combinations:")
+    print(blocks)
+    print("=" * 30)
+
+    try:
+      with dspy.context(lm=lm):
+        result = searcher(
+          demographic_blocks=blocks,
+          goals_context=goals_str,
+          limit=str(limit),
+        )
+    except Exception as e:
+      print(f"  [BATCH] Search failed for batch starting at {start}: {e}")
+      continue
+
+    for line in result.figure_names_per_block.splitlines():
+      match = re.match(r"\s*(\d+)\s*[:.)-]\s*(.*)", line)
+      if not match:
+        continue
+      index = int(match.group(1)) - 1
+      if 0 <= index < len(chunk):
+        results[start + index] = _parse_batch_names(match.group(2))
+
+  total = sum(len(r) for r in results)
+  print(f"Batched search returned {total} valid figure names")
+  return results
+
+
 def _search_worker(args):
   """Worker for parallel demographic search with retry."""
   demo_str, demo_dict, goals, limit, lm, rate_limiter = args
@@ -1,6 +1,7 @@
 """Search cache management for global query optimization."""
 
 import hashlib
+import re
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
@@ -9,6 +10,10 @@ from firebase_admin import firestore
 from backend.config import SEARCH_CACHE_TTL_DAYS
 from backend.database import db
 
+# Splits on commas and eats surrounding whitespace in one pass, replacing
+# the split-then-strip-each-item comprehension on every cache hit
+_COMMA_SPLIT = re.compile(r"\s*,\s*")
+
 
 def normalize_search_text(text: str) -> str:
   """Normalize text for consistent cache keys."""
@@ -65,38 +70,29 @@ def get_cached_search(text: str) -> Optional[Dict[str, Any]]:
 
 def _flatten_social_model(social_model: Dict[str, Any]) -> Dict[str, str]:
   """Convert list values to comma-separated strings for Firestore."""
-  flattened = {}
-  for key, value in social_model.items():
-    if isinstance(value, list):
-      flattened[key] = ", ".join(value) if value else ""
-    else:
-      flattened[key] = value if value else ""
-  return flattened
+  return {
+    key: (", ".join(value) if type(value) is list else (value or ""))
+    for key, value in social_model.items()
+  }
 
 
 def _unflatten_social_model(social_model: Dict[str, str]) -> Dict[str, List[str]]:
   """Convert comma-separated strings back to lists."""
-  unflattened = {}
-  for key, value in social_model.items():
-    if isinstance(value, str) and value:
-      unflattened[key] = [item.strip() for item in value.split(",")]
-    else:
-      unflattened[key] = []
-  return unflattened
+  return {
+    key: _COMMA_SPLIT.split(value.strip()) if isinstance(value, str) and value else []
+    for key, value in social_model.items()
+  }
 
 
-def save_to_cache(
+def _build_cache_entry(
   text: str, social_model: Dict[str, Any], figure_names: List[str], facets: List[str]
-):
-  """Save search results to cache with configured TTL."""
-  if not db:
-    return
-
+) -> Dict[str, Any]:
+  """Build the search_cache document for a search, with configured TTL."""
   cache_key = get_cache_key(text)
   now = datetime.now()
   expires_at = now + timedelta(days=SEARCH_CACHE_TTL_DAYS)
 
-  cache_entry = {
+  return {
     "text_hash": cache_key,
     "normalized_text": normalize_search_text(text),
     "social_model": _flatten_social_model(social_model),
@@ -108,5 +104,37 @@ def save_to_cache(
     "last_hit": now,
   }
 
+
+def save_to_cache(
+  text: str, social_model: Dict[str, Any], figure_names: List[str], facets: List[str]
+):
+  """Save search results to cache with configured TTL."""
+  if not db:
+    return
+
+  cache_entry = _build_cache_entry(text, social_model, figure_names, facets)
+  cache_key = cache_entry["text_hash"]
+
   db.collection("search_cache").document(cache_key).set(cache_entry)
   print(f"[CACHE] Saved search cache: {cache_key[:8]}... ({len(figure_names)} figures)")
+
+
+def stage_cache_entry(
+  batch,
+  text: str,
+  social_model: Dict[str, Any],
+  figure_names: List[str],
+  facets: List[str],
+):
+  """Stage the search_cache write onto a Firestore batch without committing.
+
+  Lets callers commit the cache entry together with other writes in a
+  single RPC (see save_search_and_cache_batch in user_service.py).
+  """
+  if not db:
+    return
+
+  cache_entry = _build_cache_entry(text, social_model, figure_names, facets)
+  batch.set(
+    db.collection("search_cache").document(cache_entry["text_hash"]), cache_entry
+  )
@@ -13,44 +13,22 @@ Usage:
 """
 
 import argparse
-import os
 
-import firebase_admin
 from dotenv import load_dotenv
-from firebase_admin import credentials, firestore
 
-from backend.embeddings import (
+load_dotenv()
+
+# Reuse the singleton client (and its credential resolution) from
+# backend.database instead of re-initializing the Firebase app here; the
+# gRPC channel setup is paid once per process, at import
+from backend.database import db  # noqa: E402
+from backend.embeddings import (  # noqa: E402
   FIELD_TEMPLATES,
   format_facet_for_embedding,
   get_embedding_model,
+  quantize_embedding,
 )
 
-load_dotenv()
-
-
-def init_firestore():
-  """Initialize Firestore connection."""
-  cred_path = os.path.expanduser("~/firebase-keys/kindred-histories-firebase-key.json")
-
-  if os.path.exists("/secrets/firebase-key.json"):
-    cred_path = "/secrets/firebase-key.json"
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
-  elif os.path.exists(cred_path):
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
-  elif os.path.exists("firebase-key.json"):
-    cred_path = "firebase-key.json"
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
-  elif os.path.exists("service-account-key.json"):
-    cred_path = "service-account-key.json"
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
-
-  if not firebase_admin._apps:
-    cred = credentials.Certificate(cred_path)
-    firebase_admin.initialize_app(cred)
-    print(f"Firebase initialized with credentials from {cred_path}")
-
-  return firestore.client()
-
 
 def extract_facets_from_tags(tags: dict) -> list[tuple[str, str, str]]:
   """
@@ -85,8 +63,9 @@ def compute_all_embeddings(debug: bool = False, batch_size: int = 64):
       debug: If True, only process 3 figures for testing
       batch_size: Number of texts to encode in each batch (default 64)
   """
-  print("Initializing Firestore...")
-  db = init_firestore()
+  if not db:
+    print("Firestore not available, aborting.")
+    return
 
   print("Loading embedding model...")
   model = get_embedding_model()
@@ -154,7 +133,7 @@ def compute_all_embeddings(debug: bool = False, batch_size: int = 64):
       else:
         facets = [value for _, value, _ in facet_tuples]
         facet_embeddings = {
-          value: all_embeddings[desc_to_idx[desc]].tolist()
+          value: quantize_embedding(all_embeddings[desc_to_idx[desc]])
           for _, value, desc in facet_tuples
         }
         doc_ref.update({"facets": facets, "facet_embeddings": facet_embeddings})
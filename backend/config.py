@@ -33,6 +33,10 @@ returned from cache without re-running the discovery pipeline."""
 MAX_FACETS_PER_QUERY = 30
 """Firestore hard limit for array-contains-any queries. Cannot be changed."""
 
+FIRESTORE_BATCH_LIMIT = 500
+"""Firestore hard limit on writes per WriteBatch. Cannot be changed.
+Bulk deletes/writes are chunked to this size before committing."""
+
 DEFAULT_CANDIDATE_LIMIT = 200
 """Max figures to fetch from Firestore before semantic scoring.
 Higher = better recall but slower. Used by query_by_facets_semantic()."""
@@ -167,6 +171,12 @@ MAX_RESEARCH_ATTEMPTS = 3
 """Maximum LLM research iterations per historical figure.
 Each attempt tries to fill missing profile fields."""
 
+SEARCH_BATCH_SIZE = 8
+"""Number of demographic combinations packed into one batched Gemini search
+prompt by search_figures_for_demographics_batch(). Amortizes the shared
+instruction tokens across combinations; kept small so answer quality does
+not degrade on long multi-part outputs."""
+
 FIGURES_PER_SEARCH = 3
 """Target number of figure names to request from each demographic search.
 Total discovered ~ DEFAULT_COMBINATION_COUNT * FIGURES_PER_SEARCH (minus duplicates)."""
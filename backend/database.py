@@ -1,9 +1,9 @@
 import os
 import time
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
 from google.cloud.firestore_v1.base_query import FieldFilter
 
 from backend.config import (
@@ -15,12 +15,14 @@ from backend.config import (
   EXACT_MATCH_PENALTY_MULTIPLIER,
   FACETS_CACHE_TTL_SECONDS,
   FACETS_REFRESH_LIMIT,
+  FIRESTORE_BATCH_LIMIT,
   MAX_FACETS_PER_QUERY,
 )
 from backend.embeddings import (
-  calculate_facet_similarity_detailed,
+  calculate_facet_similarity_batch,
   check_exact_facet_match,
   encode_facets_from_tags,
+  encode_facets_from_tags_batch,
   encode_user_facets,
 )
 
@@ -84,6 +86,15 @@ except Exception as e:
   db = None
   print(f"Firestore client creation failed: {e}")
 
+# Async client for code running on the event loop (FastAPI handlers): the
+# same gRPC credentials, but awaitable calls so the loop keeps serving other
+# requests during the Firestore round-trip instead of blocking a thread
+try:
+  db_async = firestore_async.client()
+except Exception as e:
+  db_async = None
+  print(f"Firestore async client creation failed: {e}")
+
 # Cache for facets (expires after configured TTL)
 _facets_cache: Dict[str, List[str]] = {}
 _facets_cache_time: float = 0
@@ -151,13 +162,18 @@ def _extract_searchable_text(figure_data: Dict[str, Any]) -> str:
   return " ".join(filter(None, parts))
 
 
-def save_figure(figure_data: Dict[str, Any], generate_embeddings: bool = True):
+def save_figure(
+  figure_data: Dict[str, Any], generate_embeddings: bool = True, batch=None
+):
   """
   Save a historical figure to Firestore with semantic search support.
 
   Args:
       figure_data: Figure data including name, achievement, tags, etc.
       generate_embeddings: Whether to generate embeddings for facets (default True)
+      batch: Optional firestore WriteBatch; when given, the write is staged on
+          the batch instead of committed immediately, so callers saving many
+          figures can commit them in one round-trip
   """
   if not db:
     print("Database not initialized, skipping save.")
@@ -178,12 +194,56 @@ def save_figure(figure_data: Dict[str, Any], generate_embeddings: bool = True):
 
   # Use name as document ID, sanitized
   doc_id = figure_data["name"].replace("/", "_").replace(".", "_")
-  db.collection("historical_figures").document(doc_id).set(figure_data)
+  doc_ref = db.collection("historical_figures").document(doc_id)
+  if batch is not None:
+    batch.set(doc_ref, figure_data)
+  else:
+    doc_ref.set(figure_data)
 
   facet_count = len(figure_data.get("facets", []))
   print(f"Saved figure: {figure_data['name']} ({facet_count} facets)")
 
 
+def save_figures_batch(figures: List[Dict[str, Any]], generate_embeddings: bool = True):
+  """
+  Save several figures with one embedding call and batched Firestore writes.
+
+  All facet descriptions across all figures are embedded in a single model
+  invocation (instead of one per figure), and the documents are committed in
+  chunks of FIRESTORE_BATCH_LIMIT.
+
+  Args:
+      figures: Figure dicts, each with name, achievement, tags, etc.
+      generate_embeddings: Whether to generate embeddings for facets (default True)
+  """
+  if not db:
+    print("Database not initialized, skipping save.")
+    return
+
+  if not figures:
+    return
+
+  if generate_embeddings:
+    print(f"  Generating embeddings for {len(figures)} figures in one batch...")
+    encoded = encode_facets_from_tags_batch([fig.get("tags", {}) for fig in figures])
+    for fig, (facets, facet_embeddings) in zip(figures, encoded):
+      fig["facets"] = facets
+      fig["facet_embeddings"] = facet_embeddings
+  else:
+    for fig in figures:
+      if "tags" in fig and isinstance(fig["tags"], dict):
+        fig["facets"] = _extract_facets_from_tags(fig["tags"])
+
+  for start in range(0, len(figures), FIRESTORE_BATCH_LIMIT):
+    batch = db.batch()
+    for fig in figures[start : start + FIRESTORE_BATCH_LIMIT]:
+      doc_id = fig["name"].replace("/", "_").replace(".", "_")
+      batch.set(db.collection("historical_figures").document(doc_id), fig)
+    batch.commit()
+
+  print(f"Saved {len(figures)} figures (batched)")
+
+
 def check_figure_exists(name: str) -> bool:
   if not db:
     return False
@@ -192,11 +252,62 @@ def check_figure_exists(name: str) -> bool:
   return doc.exists
 
 
+def iter_all_figures():
+  """Yield figures one document at a time.
+
+  Generator counterpart to get_all_figures for callers that scan the
+  collection without keeping every document in memory: figures are
+  consumed straight off the gRPC stream as pages arrive.
+  """
+  if not db:
+    return
+  for doc in db.collection("historical_figures").stream():
+    yield doc.to_dict()
+
+
 def get_all_figures() -> List[Dict[str, Any]]:
+  return list(iter_all_figures())
+
+
+def get_figure_by_name(name: str) -> Optional[Dict[str, Any]]:
+  """Fetch a single figure by exact name, filtered server-side.
+
+  One document crosses the wire instead of the whole collection. The
+  name doubles as the (sanitized) document id, but an equality query is
+  used so figures whose ids drifted from their names still resolve.
+  """
+  if not db:
+    return None
+  docs = (
+    db.collection("historical_figures")
+    .where(filter=FieldFilter("name", "==", name))
+    .limit(1)
+    .stream()
+  )
+  for doc in docs:
+    return doc.to_dict()
+  return None
+
+
+def get_figures_missing_image() -> List[Dict[str, Any]]:
+  """Fetch only figures without an image, filtered server-side.
+
+  Matches documents whose image_url is null or empty, so a mostly
+  complete collection costs a handful of documents instead of a full
+  download. Documents lacking the field entirely are not matched by
+  Firestore equality filters; a full backfill should use
+  get_all_figures.
+  """
   if not db:
     return []
-  docs = db.collection("historical_figures").stream()
-  return [doc.to_dict() for doc in docs]
+  collection = db.collection("historical_figures")
+  figures = []
+  for missing_value in (None, ""):
+    docs = collection.where(
+      filter=FieldFilter("image_url", "==", missing_value)
+    ).stream()
+    figures.extend(doc.to_dict() for doc in docs)
+  return figures
 
 
 def query_by_facets_exact(
@@ -323,28 +434,30 @@ def query_by_facets_semantic(
   print("  Encoding user facets...")
   user_facets_embeddings = encode_user_facets(selected_facets, facet_to_field)
 
-  # Step 3: Score each candidate
+  # Step 3: Score all candidates in one fused numpy pass (stack every
+  # figure's facet vectors once, one matmul) instead of a Python loop of
+  # per-candidate similarity calls
   print("  Calculating similarities...")
-  scored_results = []
-
-  skipped_incompatible = 0
+  candidate_data = []
   for doc in candidates:
     data = doc.to_dict()
-    facet_embeddings = data.get("facet_embeddings", {})
+    if data.get("facet_embeddings"):
+      candidate_data.append(data)
+    # else: no embeddings stored, skip (shouldn't happen with new saves)
 
-    if not facet_embeddings:
-      # No embeddings stored, skip (shouldn't happen with new saves)
-      continue
+  batch_scores = calculate_facet_similarity_batch(
+    user_facets_embeddings,
+    [data["facet_embeddings"] for data in candidate_data],
+  )
 
-    # Calculate similarity with per-facet breakdown
-    try:
-      similarity, facet_scores = calculate_facet_similarity_detailed(
-        user_facets_embeddings, facet_embeddings
-      )
-    except ValueError:
+  scored_results = []
+  skipped_incompatible = 0
+  for data, scored in zip(candidate_data, batch_scores):
+    if scored is None:
       # Dimension mismatch - figure has old embeddings, skip
       skipped_incompatible += 1
       continue
+    similarity, facet_scores = scored
 
     # Apply exact-match boosting if enabled
     if EXACT_MATCH_BOOST_ENABLED and facet_scores:
@@ -378,6 +491,34 @@ def query_by_facets_semantic(
   return results
 
 
+def format_scored_figures(
+  results_with_scores: List[Tuple[Dict[str, Any], float, Dict[str, float]]],
+) -> List[Dict[str, Any]]:
+  """
+  Attach similarity scores to the figure dicts from query_by_facets_semantic.
+
+  Mutates each figure dict in place (they are per-query copies from
+  doc.to_dict()) instead of rebuilding it, so cost is two key sets per
+  figure rather than a full dict copy.
+
+  Args:
+      results_with_scores: (figure_dict, score, facet_scores) tuples
+
+  Returns:
+      List of figure dicts with similarity_score and facet_scores added
+      and facet_embeddings removed (raw bytes, not JSON-serializable)
+  """
+  figures = []
+  for figure_data, score, facet_scores in results_with_scores:
+    # Quantized embeddings are raw bytes: orjson can't serialize them and
+    # they're useless to clients, so drop them before the dict leaves here.
+    figure_data.pop("facet_embeddings", None)
+    figure_data["similarity_score"] = round(score, 3)
+    figure_data["facet_scores"] = {k: round(v, 3) for k, v in facet_scores.items()}
+    figures.append(figure_data)
+  return figures
+
+
 def get_all_facets() -> Dict[str, List[str]]:
   """
   Get all unique facets from the database, organized by field.
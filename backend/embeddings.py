@@ -9,7 +9,7 @@ Uses BAAI/bge-small-en-v1.5 model via sentence-transformers.
 """
 
 import re
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
@@ -81,6 +81,50 @@ def encode_facet(facet: str) -> List[float]:
   return embedding.tolist()
 
 
+def quantize_embedding(vector: np.ndarray) -> Dict[str, Any]:
+  """
+  Symmetrically quantize an embedding to int8 bytes with a per-vector scale.
+
+  Stored as {"q": bytes, "scale": float} where q = round(v * 127 / max|v|)
+  and v ~= q * scale. A 384-dim facet vector costs 384 bytes in Firestore
+  instead of ~3KB as an array of doubles, which is the dominant cost when
+  fetching candidate documents for semantic search. Reconstruction error is
+  ~1% of vector magnitude, well under the min_similarity thresholds in use.
+
+  Args:
+      vector: Embedding vector (any float array-like)
+
+  Returns:
+      Dict with "q" (int8 bytes) and "scale" (float) for storage
+  """
+  vector = np.asarray(vector, dtype=np.float32)
+  peak = float(np.abs(vector).max()) if vector.size else 0.0
+  if peak == 0.0:
+    return {"q": bytes(vector.size), "scale": 0.0}
+  scale = peak / 127.0
+  q = np.round(vector / scale).astype(np.int8)
+  return {"q": q.tobytes(), "scale": scale}
+
+
+def decode_stored_embedding(entry: Any) -> np.ndarray:
+  """
+  Decode a stored facet embedding to a float32 vector.
+
+  Handles both the quantized {"q": bytes, "scale": float} format and legacy
+  documents saved as plain float lists before quantization.
+
+  Args:
+      entry: One value from a facet_embeddings dict
+
+  Returns:
+      1-D float32 numpy array
+  """
+  if isinstance(entry, dict):
+    q = np.frombuffer(entry["q"], dtype=np.int8).astype(np.float32)
+    return q * entry["scale"]
+  return np.asarray(entry, dtype=np.float32)
+
+
 def encode_facets(facets: List[str]) -> Dict[str, List[float]]:
   """
   Encode multiple facets into embeddings.
@@ -135,9 +179,25 @@ def encode_user_facets(
   return {facet: emb.tolist() for facet, emb in zip(selected_facets, embeddings)}
 
 
+def _collect_facet_pairs(tags: Dict[str, any]) -> List[Tuple[str, str]]:
+  """Collect deduplicated (field, value) pairs from a tags dict."""
+  facet_pairs = []  # [(field, value), ...]
+  seen_values = set()
+
+  for field in FIELD_TEMPLATES.keys():
+    if field in tags and tags[field]:
+      values = tags[field] if isinstance(tags[field], list) else [tags[field]]
+      for value in values:
+        if value and value not in seen_values:
+          facet_pairs.append((field, value))
+          seen_values.add(value)
+
+  return facet_pairs
+
+
 def encode_facets_from_tags(
   tags: Dict[str, any],
-) -> tuple[List[str], Dict[str, List[float]]]:
+) -> tuple[List[str], Dict[str, Any]]:
   """
   Extract facets from tags dict and encode with rich descriptions.
 
@@ -150,22 +210,13 @@ def encode_facets_from_tags(
   Returns:
       Tuple of (facets_list, facet_embeddings):
       - facets_list: Deduplicated list of raw facet values for display
-      - facet_embeddings: Dict mapping raw facet value to its embedding
+      - facet_embeddings: Dict mapping raw facet value to its quantized
+        embedding (see quantize_embedding)
   """
   if not tags:
     return [], {}
 
-  # Collect (field, value) pairs and deduplicate
-  facet_pairs = []  # [(field, value), ...]
-  seen_values = set()
-
-  for field in FIELD_TEMPLATES.keys():
-    if field in tags and tags[field]:
-      values = tags[field] if isinstance(tags[field], list) else [tags[field]]
-      for value in values:
-        if value and value not in seen_values:
-          facet_pairs.append((field, value))
-          seen_values.add(value)
+  facet_pairs = _collect_facet_pairs(tags)
 
   if not facet_pairs:
     return [], {}
@@ -181,14 +232,64 @@ def encode_facets_from_tags(
   embeddings = model.encode(descriptions, convert_to_numpy=True)
 
   # Map raw values to embeddings (so keys match user queries)
-  facet_embeddings = {raw: emb.tolist() for raw, emb in zip(raw_values, embeddings)}
+  facet_embeddings = {
+    raw: quantize_embedding(emb) for raw, emb in zip(raw_values, embeddings)
+  }
 
   return raw_values, facet_embeddings
 
 
+def encode_facets_from_tags_batch(
+  tags_list: List[Dict[str, any]],
+) -> List[tuple[List[str], Dict[str, Any]]]:
+  """
+  Encode facets for several figures with a single model call.
+
+  Flattens the facet descriptions of all figures into one encode() batch and
+  scatters the resulting vectors back per figure via index offsets, so N
+  figures cost one model invocation instead of N.
+
+  Args:
+      tags_list: One tags dict per figure
+
+  Returns:
+      One (facets_list, facet_embeddings) tuple per figure, in input order
+  """
+  pairs_per_figure = [_collect_facet_pairs(tags or {}) for tags in tags_list]
+
+  flat_descriptions = [
+    format_facet_for_embedding(field, value)
+    for pairs in pairs_per_figure
+    for field, value in pairs
+  ]
+
+  if not flat_descriptions:
+    return [([], {}) for _ in tags_list]
+
+  model = get_embedding_model()
+  embeddings = model.encode(flat_descriptions, convert_to_numpy=True)
+
+  if len(embeddings) != len(flat_descriptions):
+    # Defensive fallback: scatter-by-offset needs a full result list
+    return [encode_facets_from_tags(tags or {}) for tags in tags_list]
+
+  results = []
+  offset = 0
+  for pairs in pairs_per_figure:
+    raw_values = [value for _, value in pairs]
+    facet_embeddings = {
+      raw: quantize_embedding(embeddings[offset + i])
+      for i, raw in enumerate(raw_values)
+    }
+    offset += len(pairs)
+    results.append((raw_values, facet_embeddings))
+
+  return results
+
+
 def calculate_facet_similarity(
   user_facets_embeddings: Dict[str, List[float]],
-  figure_facets_embeddings: Dict[str, List[float]],
+  figure_facets_embeddings: Dict[str, Any],
 ) -> float:
   """
   Calculate semantic similarity between user facets and figure facets using matrix operations.
@@ -213,9 +314,11 @@ def calculate_facet_similarity(
   if not user_facets_embeddings or not figure_facets_embeddings:
     return 0.0
 
-  # Stack embeddings into matrices
+  # Stack embeddings into matrices (figure vectors may be stored quantized)
   user_matrix = np.array(list(user_facets_embeddings.values()))
-  figure_matrix = np.array(list(figure_facets_embeddings.values()))
+  figure_matrix = np.stack(
+    [decode_stored_embedding(v) for v in figure_facets_embeddings.values()]
+  )
 
   # Normalize embeddings for cosine similarity
   user_norms = np.linalg.norm(user_matrix, axis=1, keepdims=True)
@@ -241,7 +344,7 @@ def calculate_facet_similarity(
 
 def calculate_facet_similarity_detailed(
   user_facets_embeddings: Dict[str, List[float]],
-  figure_facets_embeddings: Dict[str, List[float]],
+  figure_facets_embeddings: Dict[str, Any],
 ) -> Tuple[float, Dict[str, float]]:
   """
   Calculate semantic similarity with per-facet breakdown.
@@ -261,7 +364,9 @@ def calculate_facet_similarity_detailed(
 
   user_facets_list = list(user_facets_embeddings.keys())
   user_matrix = np.array(list(user_facets_embeddings.values()))
-  figure_matrix = np.array(list(figure_facets_embeddings.values()))
+  figure_matrix = np.stack(
+    [decode_stored_embedding(v) for v in figure_facets_embeddings.values()]
+  )
 
   # Normalize embeddings for cosine similarity
   user_norms = np.linalg.norm(user_matrix, axis=1, keepdims=True)
@@ -291,6 +396,79 @@ def calculate_facet_similarity_detailed(
   return overall_score, facet_scores
 
 
+def calculate_facet_similarity_batch(
+  user_facets_embeddings: Dict[str, List[float]],
+  figure_facets_embeddings_list: List[Dict[str, Any]],
+) -> List[Optional[Tuple[float, Dict[str, float]]]]:
+  """
+  Score many figures against the user's facets in one fused kernel.
+
+  Instead of normalizing the user matrix and running a matmul per candidate,
+  all figures' facet vectors are stacked into a single (F_total, dim) matrix
+  with an offsets array (CSR-style), normalized once, and scored with one
+  user @ figures.T product. Per-figure results are then read out of column
+  segments. Same numbers as calculate_facet_similarity_detailed, one numpy
+  dispatch instead of N.
+
+  Args:
+      user_facets_embeddings: {facet: embedding} for user's selected facets
+      figure_facets_embeddings_list: one {facet: embedding} dict per figure
+
+  Returns:
+      One (overall_score, facet_scores) tuple per figure, in input order.
+      Entries are None for figures whose stored embeddings have an
+      incompatible dimension (old saves).
+  """
+  n_figures = len(figure_facets_embeddings_list)
+  if not user_facets_embeddings or not n_figures:
+    return [None] * n_figures
+
+  user_facets_list = list(user_facets_embeddings.keys())
+  user_matrix = np.array(list(user_facets_embeddings.values()))
+  user_norms = np.maximum(np.linalg.norm(user_matrix, axis=1, keepdims=True), 1e-10)
+  user_normalized = user_matrix / user_norms
+  dim = user_matrix.shape[1]
+
+  # Stack all compatible figures' vectors; remember each figure's column span
+  figure_matrices = []
+  spans = []  # (figure_index, start, end)
+  offset = 0
+  for i, fig_embeddings in enumerate(figure_facets_embeddings_list):
+    if not fig_embeddings:
+      continue
+    try:
+      matrix = np.stack([decode_stored_embedding(v) for v in fig_embeddings.values()])
+    except ValueError:
+      # Ragged vectors - figure has corrupt embeddings, skip
+      continue
+    if matrix.shape[1] != dim:
+      # Dimension mismatch - figure has old embeddings, skip
+      continue
+    figure_matrices.append(matrix)
+    spans.append((i, offset, offset + matrix.shape[0]))
+    offset += matrix.shape[0]
+
+  results: List[Optional[Tuple[float, Dict[str, float]]]] = [None] * n_figures
+  if not figure_matrices:
+    return results
+
+  stacked = np.vstack(figure_matrices)
+  stacked_norms = np.maximum(np.linalg.norm(stacked, axis=1, keepdims=True), 1e-10)
+  stacked_normalized = stacked / stacked_norms
+
+  # One (n_user x F_total) similarity matrix for all figures
+  similarity_matrix = user_normalized @ stacked_normalized.T
+
+  for i, start, end in spans:
+    max_similarities = np.max(similarity_matrix[:, start:end], axis=1)
+    facet_scores = {
+      facet: float(score) for facet, score in zip(user_facets_list, max_similarities)
+    }
+    results[i] = (float(np.mean(max_similarities)), facet_scores)
+
+  return results
+
+
 def check_exact_facet_match(
   facet: str, searchable_text: str, case_sensitive: bool = False
 ) -> bool:
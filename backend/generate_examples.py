@@ -1,9 +1,10 @@
 """ """
 
-import json
 import os
 import sys
 
+import orjson
+
 # Add project root to path so we can import from backend
 sys.path.append(os.getcwd())
 
@@ -110,8 +111,8 @@ def main():
     }
 
   print(f"\nWriting to {OUTPUT_FILE}...")
-  with open(OUTPUT_FILE, "w") as f:
-    json.dump(output_data, f, indent=2)
+  with open(OUTPUT_FILE, "wb") as f:
+    f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
 
   print("Done!")
 
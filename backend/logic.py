@@ -1,3 +1,4 @@
+import logging
 import multiprocessing
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -10,9 +11,11 @@ from backend.config import (
   DEFAULT_MIN_SIMILARITY,
   IMMEDIATE_RESULTS_LIMIT,
 )
-from backend.database import query_by_facets_semantic
+from backend.database import format_scored_figures, query_by_facets_semantic
 from backend.models import SocialModel
-from backend.user_service import save_user_search, update_user_search
+from backend.user_service import save_search_and_cache_batch, save_user_search
+
+log = logging.getLogger(__name__)
 
 
 def process_single_person(name: str):
@@ -33,7 +36,7 @@ class Orchestrator:
     self.max_workers = (
       DEBUG_MAX_WORKERS if os.environ.get("DEBUG") else multiprocessing.cpu_count()
     )
-    print(f"Orchestrator initialized with {self.max_workers} workers.")
+    log.info("Orchestrator initialized with %s workers.", self.max_workers)
 
   def extract_and_query_immediate(
     self,
@@ -45,35 +48,30 @@ class Orchestrator:
     Phase 1: Extract facets and query existing DB matches.
     Returns immediately with (social_model, facets, existing_figures).
     """
-    print(f"[Immediate Phase] Starting for: {description[:50]}...")
+    log.info("[Immediate Phase] Starting for: %s...", description[:50])
 
     # 1. Extract or use provided facets
     if provided_facets and provided_social_model:
-      print("[Immediate Phase] Using provided facets")
-      social_model = SocialModel(**provided_social_model)
+      log.info("[Immediate Phase] Using provided facets")
+      # The dict comes from our own cache/frontend extraction output, so skip
+      # full Pydantic validation via the model_construct fast path
+      social_model = SocialModel.model_construct(**provided_social_model)
       facets = provided_facets
     else:
-      print("[Immediate Phase] Extracting facets from text")
+      log.info("[Immediate Phase] Extracting facets from text")
       social_model = self.agent.extract_demographics_from_text(description)
       facets = social_model.as_list(include_goals=True)
 
     # 2. Query database for existing matches
-    print(f"[Immediate Phase] Querying DB for {len(facets)} facets...")
+    log.info("[Immediate Phase] Querying DB for %s facets...", len(facets))
     results_with_scores = query_by_facets_semantic(
       facets, limit=IMMEDIATE_RESULTS_LIMIT, min_similarity=DEFAULT_MIN_SIMILARITY
     )
 
     # 3. Format figures with scores
-    figures = []
-    for figure_data, score, facet_scores in results_with_scores:
-      figure_with_score = {
-        **figure_data,
-        "similarity_score": round(score, 3),
-        "facet_scores": {k: round(v, 3) for k, v in facet_scores.items()},
-      }
-      figures.append(figure_with_score)
+    figures = format_scored_figures(results_with_scores)
 
-    print(f"[Immediate Phase] Found {len(figures)} existing matches")
+    log.info("[Immediate Phase] Found %s existing matches", len(figures))
     return social_model, facets, figures
 
   def run_background_discovery(
@@ -94,7 +92,7 @@ class Orchestrator:
         user_id: Firebase UID if authenticated
         search_id: If provided, update this existing search record instead of creating new
     """
-    print(f"[Background Phase] Starting discovery for: {description[:50]}...")
+    log.info("[Background Phase] Starting discovery for: %s...", description[:50])
 
     # Discover new names (now returns a list, not iterator)
     discovered_pairs = self.agent.process_user_request_from_social_model(social_model)
@@ -106,8 +104,10 @@ class Orchestrator:
       futures = []
       for name, demo_str in discovered_pairs:
         discovered_names.append(name)
-        print(
-          f"[Background Phase] Submitting task for: {name} (demographics: {demo_str})"
+        log.info(
+          "[Background Phase] Submitting task for: %s (demographics: %s)",
+          name,
+          demo_str,
         )
         future = executor.submit(process_single_person, name)
         futures.append(future)
@@ -116,9 +116,9 @@ class Orchestrator:
       for future in as_completed(futures):
         try:
           result = future.result()
-          print(f"[Background Phase] Task completion: {result}")
+          log.info("[Background Phase] Task completion: %s", result)
         except Exception as e:
-          print(f"[Background Phase] Task exception: {e}")
+          log.error("[Background Phase] Task exception: %s", e)
 
     # Save to cache and user history
     social_model_dict = {
@@ -131,21 +131,21 @@ class Orchestrator:
       "aspirations": social_model.aspirations or [],
     }
 
-    save_to_cache(description, social_model_dict, discovered_names, facets)
-
-    # Update or create user search history
-    if search_id and discovered_names:
-      # Update existing search record by adding newly discovered names
-      # (existing names from immediate query are already saved)
-      update_user_search(search_id, discovered_names, append=True)
-    elif user_id:
-      # Fallback: create new search record (for direct calls without search_id)
-      save_user_search(
-        user_id, description, social_model_dict, discovered_names, facets
-      )
-
-    print(
-      f"[Background Phase] Discovery complete. Found {len(discovered_names)} new figures."
+    # Commit cache entry + user search history as a single Firestore batch
+    # (existing names from the immediate query are already saved; discovered
+    # names are appended to the search record via ArrayUnion)
+    save_search_and_cache_batch(
+      description,
+      social_model_dict,
+      discovered_names,
+      facets,
+      user_id=user_id,
+      search_id=search_id,
+    )
+
+    log.info(
+      "[Background Phase] Discovery complete. Found %s new figures.",
+      len(discovered_names),
     )
 
   def run_analysis(self, description: str, user_id: Optional[str] = None):
@@ -161,7 +161,7 @@ class Orchestrator:
     3. Spawns processes to research people.
     4. Saves results to cache and user history (if authenticated).
     """
-    print(f"Starting analysis for: {description[:30]}...")
+    log.info("Starting analysis for: %s...", description[:30])
 
     # Extract demographics first
     social_model = self.agent.extract_demographics_from_text(description)
@@ -176,7 +176,7 @@ class Orchestrator:
       futures = []
       for name, demo_str in discovered_pairs:
         discovered_names.append(name)
-        print(f"Submitting task for: {name} (demographics: {demo_str})")
+        log.info("Submitting task for: %s (demographics: %s)", name, demo_str)
         future = executor.submit(process_single_person, name)
         futures.append(future)
 
@@ -184,9 +184,9 @@ class Orchestrator:
       for future in as_completed(futures):
         try:
           result = future.result()
-          print(f"Task completion: {result}")
+          log.info("Task completion: %s", result)
         except Exception as e:
-          print(f"Task exception: {e}")
+          log.error("Task exception: %s", e)
 
     # After completion, save to cache and user history
     if social_model:
@@ -212,4 +212,4 @@ class Orchestrator:
           user_id, description, social_model_dict, discovered_names, facets
         )
 
-      print(f"Analysis complete. Found {len(discovered_names)} figures.")
+      log.info("Analysis complete. Found %s figures.", len(discovered_names))
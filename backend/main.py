@@ -1,11 +1,18 @@
+import asyncio
+import logging
 import os
+import queue
+import sys
 import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
 from typing import List
 
 import dspy
 import uvicorn
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from backend.agent import DemographicExtraction, ensure_list
 from backend.auth import get_current_user, require_auth
@@ -21,6 +28,7 @@ from backend.config import (
 )
 from backend.database import (
   db,
+  format_scored_figures,
   get_all_facets,
   get_all_figures,
   query_by_facets_exact,
@@ -37,18 +45,79 @@ from backend.user_service import (
   get_user_searches,
   save_or_update_user,
   save_user_search,
+  save_user_search_with_id,
 )
 
-app = FastAPI()
+# orjson serializes the float-heavy figure lists several times faster than
+# stdlib json
+app = FastAPI(default_response_class=ORJSONResponse)
+
+log = logging.getLogger(__name__)
+
+# Keep a reference so the listener thread isn't garbage collected
+_log_listener: QueueListener = None
+
+
+def _setup_queue_logging():
+  """Route log records through a queue drained by a single listener thread.
+
+  Hot paths log once per task/completion/cache-hit; with plain print() each
+  call takes a lock on sys.stdout and does a write syscall inline. With a
+  QueueHandler the request thread only enqueues the record, and formatting
+  plus IO happen on the listener thread.
+  """
+  global _log_listener
+  root = logging.getLogger()
+  if any(isinstance(h, QueueHandler) for h in root.handlers):
+    return  # Already configured (e.g. uvicorn --reload re-imports)
+
+  q = queue.SimpleQueue()
+  stream_handler = logging.StreamHandler(sys.stdout)
+  stream_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s %(message)s"))
+  _log_listener = QueueListener(q, stream_handler)
+  _log_listener.start()
+  root.addHandler(QueueHandler(q))
+  root.setLevel(logging.INFO)
+
+
+# Precomputed once so analyze_profile doesn't rebuild the field list per request
+_SOCIAL_MODEL_FIELDS = frozenset(
+  (
+    "race",
+    "ethnicity",
+    "cultural_background",
+    "gender",
+    "sexuality",
+    "interests",
+    "aspirations",
+    "location",
+  )
+)
 
 
 @app.on_event("startup")
 async def warmup_models():
-  """Pre-load embedding model at startup."""
-  print("Initializing embedding model...")
+  """Pre-load embedding model and LLM clients at startup.
+
+  Warming the Orchestrator's agent and the extraction LM here moves the
+  cold-start cost (DSPy LM init + first Gemini round-trip) off the first
+  /api/analyze request.
+  """
+  _setup_queue_logging()
+
+  log.info("Initializing embedding model...")
   get_embedding_model()  # Load model into memory
   encode_facet("warmup")  # Trigger first inference to warm up
-  print("Warmup complete")
+
+  log.info("Warming up LLM clients...")
+  try:
+    get_extraction_lm()  # Force DSPy LM init for /api/extract-facets
+    orchestrator.agent.extract_demographics_from_text("warmup ignore")
+  except Exception as e:
+    # Warmup is best-effort; the first request just pays the cost instead
+    log.warning("LLM warmup failed (continuing): %s", e)
+
+  log.info("Warmup complete")
 
 
 # Enable CORS for frontend
@@ -102,7 +171,7 @@ async def login_user(user=Depends(get_current_user)):
   Requires: Authorization header with Firebase ID token
   """
   user = require_auth(user)
-  save_or_update_user(user)
+  await save_or_update_user(user)
 
   return {
     "uid": user["uid"],
@@ -135,7 +204,7 @@ async def analyze_profile(
   cached = get_cached_search(description.text)
 
   if cached:
-    print(f"[CACHE HIT] Using cached results for: {description.text[:50]}...")
+    log.info("[CACHE HIT] Using cached results for: %s...", description.text[:50])
 
     # If authenticated, still save to user history
     if user:
@@ -164,17 +233,7 @@ async def analyze_profile(
     provided_social_model = description.social_model
     if provided_social_model:
       has_facets = any(
-        provided_social_model.get(field)
-        for field in [
-          "race",
-          "ethnicity",
-          "cultural_background",
-          "gender",
-          "sexuality",
-          "interests",
-          "aspirations",
-          "location",
-        ]
+        provided_social_model.get(field) for field in _SOCIAL_MODEL_FIELDS
       )
 
       if not has_facets:
@@ -200,15 +259,20 @@ async def analyze_profile(
       "aspirations": social_model.aspirations or [],
     }
 
-    # Save search immediately if authenticated (before background discovery)
-    # This ensures the search is persisted even if discovery fails
+    # Save search in the background if authenticated (before background discovery)
+    # Pre-generate the document ID so we don't block the response on the
+    # Firestore write; the discovery task references the same search_id.
     # Include existing figure names from immediate query results
     search_id = None
     if user_id:
+      # Single dict lookup per figure via the walrus binding
       existing_figure_names = [
-        fig.get("name", "") for fig in existing_figures if fig.get("name")
+        name for fig in existing_figures if (name := fig.get("name"))
       ]
-      search_id = save_user_search(
+      search_id = str(uuid.uuid4())
+      background_tasks.add_task(
+        save_user_search_with_id,
+        search_id,
         user_id,
         description.text,
         social_model_dict,
@@ -235,11 +299,8 @@ async def analyze_profile(
       "count": len(existing_figures),
     }
 
-  except Exception as e:
-    print(f"[ERROR] Failed to extract and query: {e}")
-    import traceback
-
-    traceback.print_exc()
+  except Exception:
+    log.exception("[ERROR] Failed to extract and query")
 
     # Fallback to old behavior
     background_tasks.add_task(
@@ -324,10 +385,79 @@ async def extract_user_facets(description: UserDescription):
   return await coalesced_request(description.text, do_extraction)
 
 
+@app.post("/api/begin-journey")
+async def begin_journey(
+  description: UserDescription,
+  background_tasks: BackgroundTasks,
+  user=Depends(get_current_user),
+):
+  """
+  Fused "Begin Journey" endpoint: facet extraction + initial analysis.
+
+  The frontend used to POST /api/extract-facets, wait for the response, then
+  POST /api/analyze with the extracted facets echoed back. This endpoint runs
+  both phases in-process, so the intermediate payload never crosses the wire
+  and the client pays one HTTP round-trip instead of two.
+
+  Returns:
+      The /api/analyze response body plus the extraction payload and
+      server-side per-stage timings:
+      {
+          "facets": [...],
+          "social_model": {...},
+          "analyze": {...},
+          "timings": {"extract_facets": 1.2, "analyze": 0.4}
+      }
+  """
+  # Warm the facet catalog on a worker thread while the LLM round-trip is in
+  # flight: the semantic query inside analyze needs get_all_facets(), and
+  # prefetching it here means that call hits the in-process cache instead of
+  # Firestore. Total wall time becomes max(extract, prefetch) not their sum.
+  warmup_task = asyncio.create_task(asyncio.to_thread(get_all_facets))
+
+  extract_start = time.perf_counter()
+  facet_data = await extract_user_facets(description)
+  extract_time = time.perf_counter() - extract_start
+
+  # Best-effort: analyze falls back to a live Firestore read if this failed
+  try:
+    await warmup_task
+  except Exception as e:
+    log.warning("Facet catalog prefetch failed (continuing): %s", e)
+
+  # Feed the extraction output straight into the analyze handler without
+  # re-serializing; same code path the separate endpoints use
+  analyze_start = time.perf_counter()
+  analyze_data = await analyze_profile(
+    UserDescription(
+      text=description.text,
+      facets=facet_data.get("facets"),
+      social_model=facet_data.get("social_model"),
+    ),
+    background_tasks,
+    user=user,
+  )
+  analyze_time = time.perf_counter() - analyze_start
+
+  return {
+    "facets": facet_data.get("facets", []),
+    "social_model": facet_data.get("social_model", {}),
+    "analyze": analyze_data,
+    "timings": {
+      "extract_facets": round(extract_time, 3),
+      "analyze": round(analyze_time, 3),
+    },
+  }
+
+
 @app.get("/api/results")
 async def get_results():
   """Retrieve all found historical figures."""
   figures = get_all_figures()
+  # Stored figures carry quantized facet_embeddings (raw bytes) that
+  # orjson can't serialize and clients don't need.
+  for figure in figures:
+    figure.pop("facet_embeddings", None)
   return figures
 
 
@@ -377,6 +507,8 @@ async def get_figures_by_facets_exact(
     facets = []
 
   results = query_by_facets_exact(facets, limit)
+  for figure in results:
+    figure.pop("facet_embeddings", None)
   return {
     "figures": results,
     "count": len(results),
@@ -438,15 +570,7 @@ async def get_figures_by_facets_semantic(
     facets, limit=limit, min_similarity=min_similarity
   )
 
-  # Add similarity_score and facet_scores to each figure dict
-  figures = []
-  for figure_data, score, facet_scores in results_with_scores:
-    figure_with_score = {
-      **figure_data,
-      "similarity_score": round(score, 3),
-      "facet_scores": {k: round(v, 3) for k, v in facet_scores.items()},
-    }
-    figures.append(figure_with_score)
+  figures = format_scored_figures(results_with_scores)
 
   return {
     "figures": figures,
@@ -460,7 +584,7 @@ async def get_my_searches(user=Depends(get_current_user)):
   """Get authenticated user's search history."""
   user = require_auth(user)
 
-  searches = get_user_searches(user["uid"])
+  searches = await get_user_searches(user["uid"])
   return {"searches": searches}
 
 
@@ -502,14 +626,7 @@ async def rerun_search(search_id: str, user=Depends(get_current_user)):
   )
 
   # Format response
-  figures = []
-  for figure_data, score, facet_scores in results_with_scores:
-    figure_with_score = {
-      **figure_data,
-      "similarity_score": round(score, 3),
-      "facet_scores": {k: round(v, 3) for k, v in facet_scores.items()},
-    }
-    figures.append(figure_with_score)
+  figures = format_scored_figures(results_with_scores)
 
   return {
     "search_text": search_data.get("search_text"),
@@ -525,7 +642,7 @@ async def delete_all_searches(user=Depends(get_current_user)):
   """Delete all searches for the authenticated user."""
   user = require_auth(user)
 
-  deleted_count = delete_all_user_searches(user["uid"])
+  deleted_count = await delete_all_user_searches(user["uid"])
 
   return {"message": f"Deleted {deleted_count} searches", "deleted": deleted_count}
 
@@ -535,7 +652,7 @@ async def delete_search(search_id: str, user=Depends(get_current_user)):
   """Delete a user's search history entry."""
   user = require_auth(user)
 
-  success = delete_user_search(search_id, user["uid"])
+  success = await delete_user_search(search_id, user["uid"])
 
   if not success:
     raise HTTPException(404, "Search not found or unauthorized")
@@ -555,4 +672,8 @@ if __name__ == "__main__":
     port=port,
     reload=reload,
     workers=workers if not reload else 1,
+    # uvloop + httptools cut per-request event-loop/parsing overhead vs the
+    # default asyncio loop and h11 parser
+    loop="uvloop",
+    http="httptools",
   )
@@ -1,6 +1,6 @@
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 
 class UserDescription(BaseModel):
@@ -19,11 +19,21 @@ class SocialModel(BaseModel):
   interests: Optional[List[str]] = None
   aspirations: Optional[List[str]] = None
 
+  # Memoized as_list results, keyed by include_goals. The model is built once
+  # per request and treated as immutable, so the cache is never invalidated.
+  _as_list_cache: Dict[bool, List[str]] = PrivateAttr(default_factory=dict)
+
   def as_list(self, include_goals: bool = False) -> List[str]:
     """Return a flattened, deduplicated list of all demographic values.
 
     Deduplication is case-insensitive but preserves original case of first occurrence.
+    The result is cached on the instance since callers re-request it several
+    times per request lifecycle.
     """
+    cached = self._as_list_cache.get(include_goals)
+    if cached is not None:
+      return cached
+
     seen = set()
     result = []
     for field_value in [
@@ -40,6 +50,8 @@ class SocialModel(BaseModel):
           if val.lower() not in seen:
             seen.add(val.lower())
             result.append(val)
+
+    self._as_list_cache[include_goals] = result
     return result
 
   def as_str(self) -> str:
@@ -7,8 +7,11 @@ the result is shared among all waiters.
 
 import asyncio
 import hashlib
+import logging
 from typing import Any, Awaitable, Callable, Dict
 
+log = logging.getLogger(__name__)
+
 # Store pending requests: key -> Future
 _pending_requests: Dict[str, asyncio.Future] = {}
 _lock = asyncio.Lock()
@@ -40,13 +43,13 @@ async def coalesced_request(
   async with _lock:
     # Check if there's already a pending request for this key
     if key in _pending_requests:
-      print(f"[COALESCE] Joining existing request for: {key_text[:50]}...")
+      log.info("[COALESCE] Joining existing request for: %s...", key_text[:50])
       future = _pending_requests[key]
     else:
       # Create a new future and register it
       future = asyncio.get_event_loop().create_future()
       _pending_requests[key] = future
-      print(f"[COALESCE] New request for: {key_text[:50]}...")
+      log.info("[COALESCE] New request for: %s...", key_text[:50])
 
       # Start the work in a task (outside the lock)
       asyncio.create_task(_do_work_and_resolve(key, async_work_fn, future))
@@ -66,10 +69,10 @@ async def _do_work_and_resolve(
   try:
     result = await async_work_fn()
     future.set_result(result)
-    print(f"[COALESCE] Completed request for key: {key[:16]}...")
+    log.info("[COALESCE] Completed request for key: %s...", key[:16])
   except Exception as e:
     future.set_exception(e)
-    print(f"[COALESCE] Failed request for key: {key[:16]}... Error: {e}")
+    log.error("[COALESCE] Failed request for key: %s... Error: %s", key[:16], e)
   finally:
     # Clean up the pending request
     async with _lock:
@@ -1,19 +1,31 @@
 import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 import backend.database  # Trigger credential setup
 from backend.agent import (
   StoryGeneratorAgent,
   ensure_list,
   sample_demographic_combinations,
-  search_figures_for_demographic_gemini,
+  search_figures_for_demographics_batch,
 )
 from backend.models import SocialModel
 
 
+@functools.lru_cache(maxsize=1)
+def _get_agent() -> StoryGeneratorAgent:
+  """Share one agent across debug steps.
+
+  Construction sets up the Gemini LM client and DSPy modules; with
+  --step=all the old code paid that three times.
+  """
+  return StoryGeneratorAgent()
+
+
 # Mock/Debug helper
 def debug_attributes():
   print("--- Testing Attribute Inference ---")
-  agent = StoryGeneratorAgent()
+  agent = _get_agent()
   desc = "I am a Mexican neuroscientist who wants to use compassion to help others."
   # New method name involves calling the ChainOfThought module directly or wrapping it
   # process_user_request does extraction + combination + search.
@@ -51,52 +63,56 @@ def debug_combinations(demographics=None):
   return samples
 
 
-def debug_find_people(combo_data=None, demographics=None):
-  print("\n--- Testing Find People ---")
-  agent = StoryGeneratorAgent()
+def debug_find_people(combos=None, demographics=None):
+  print("\n--- Testing Find People (batched) ---")
+  agent = _get_agent()
 
   if not demographics:
     demographics = SocialModel(ethnicity=["Mexican"], interests=["Neuroscience"])
 
-  combo_str = "Mexican, Neuroscientist"
-  if combo_data:
-    combo_str, _ = combo_data
+  if not combos:
+    combos = [("Mexican, Neuroscientist", {"ethnicity": "Mexican"})]
 
-  print(f"Searching for: {combo_str}")
+  print(f"Searching {len(combos)} combination(s) in one batched call")
 
-  figures = search_figures_for_demographic_gemini(
-    demographics=demographics,
-    demographic_str=combo_str,
+  # One LLM call per batch of combinations instead of one per combination
+  figures_per_combo = search_figures_for_demographics_batch(
+    combos,
+    goals=demographics.goals(),
     limit=3,
-    debug=True,
     lm=agent.lm,
   )
 
-  names = [f.name for f in figures]
+  names = [name for combo_names in figures_per_combo for name in combo_names]
   print("Found name(s):", names)
   return names
 
 
 def debug_modeller_judge(name="Santiago Ramón y Cajal"):
   print(f"\n--- Testing Modeller/Judge Loop for {name} ---")
-  agent = StoryGeneratorAgent()
+  agent = _get_agent()
   agent.process_person(name)
 
 
 def debug_process_person():
   print("--- Testing Process Person (Modeller/Judge Loop) ---")
-  agent = StoryGeneratorAgent()
+  agent = _get_agent()
   # Test with a specific figure
   target_name = "Bayard Rustin"
 
-  # Clean up before test to ensure we run
+  # Clean up before test to ensure we run. The delete RTT overlaps the
+  # research loop: process_person only writes at the end, long after the
+  # delete has landed.
   doc_id = target_name.replace("/", "_").replace(".", "_")
-  if backend.database.db:
-    backend.database.db.collection("historical_figures").document(doc_id).delete()
-    print(f"Cleared existing entry for {target_name}")
-
-  print(f"Processing: {target_name}")
-  agent.process_person(target_name)
+  with ThreadPoolExecutor(max_workers=1) as pool:
+    if backend.database.db:
+      pool.submit(
+        backend.database.db.collection("historical_figures").document(doc_id).delete
+      )
+      print(f"Clearing existing entry for {target_name} in the background")
+
+    print(f"Processing: {target_name}")
+    agent.process_person(target_name)
   print("Check Firestore for results (e.g. valid facets).")
 
 
@@ -125,6 +141,6 @@ if __name__ == "__main__":
     attrs = debug_attributes()
     combos = debug_combinations(attrs)
     if combos:
-      names = debug_find_people(combos[0], attrs)
+      names = debug_find_people(combos, attrs)
       if names:
         debug_modeller_judge(names[0])
@@ -11,7 +11,7 @@ from backend.database import (
   get_all_facets,
   query_by_facets_exact,
   query_by_facets_semantic,
-  save_figure,
+  save_figures_batch,
 )
 
 
@@ -96,9 +96,8 @@ def create_test_figures():
   print("Creating test figures with embeddings...")
   print("=" * 60)
 
-  for fig in test_figures:
-    print(f"\nSaving: {fig['name']}")
-    save_figure(fig, generate_embeddings=True)
+  # One embedding call for all figures' facets + one batched Firestore commit
+  save_figures_batch(test_figures, generate_embeddings=True)
 
   print("\n" + "=" * 60)
   print("Test figures created successfully!")
@@ -1,9 +1,258 @@
+import asyncio
+import atexit
+import hashlib
+import multiprocessing
 import os
+import shelve
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
+import httpx
 import requests
+from urllib3.util.retry import Retry
+
+# Module-level session so TCP+TLS connections (and DNS state) are reused
+# across calls instead of paying a fresh handshake per request. All Google
+# API calls hit one host; image validation benefits whenever candidates
+# share a CDN.
+_session = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(
+  pool_connections=50,
+  pool_maxsize=100,
+  max_retries=Retry(total=2, backoff_factor=0.1),
+)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# Synchronous validation client: HTTP/2 multiplexes the concurrent HEADs
+# that pile onto one CDN over a single TCP+TLS connection, so per-host
+# concurrency no longer costs a socket (and handshake) each. The requests
+# session above stays for the Google API calls, which are one-at-a-time
+# per thread anyway.
+_sync_validation_client = httpx.Client(
+  transport=httpx.HTTPTransport(
+    retries=2,
+    http2=True,
+    # A 30s keepalive holds connections (and their resolved addresses)
+    # across validation bursts, so repeat hosts skip DNS as well as the
+    # TCP+TLS handshake
+    limits=httpx.Limits(
+      max_connections=100,
+      max_keepalive_connections=50,
+      keepalive_expiry=30.0,
+    ),
+  ),
+  timeout=httpx.Timeout(5.0, connect=3.0),
+  follow_redirects=True,
+)
+
+# Content types accepted as images; O(1) membership test on the parsed MIME
+_VALID_IMAGE_TYPES = frozenset(
+  (
+    "image/jpeg",
+    "image/jpg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/bmp",
+  )
+)
+
+# Path suffixes that already prove image-ness; URLs ending in one of these
+# skip the HEAD round-trip entirely
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp")
+
+# Magic-number prefixes accepted when a server rejects HEAD and the first
+# bytes of a ranged GET are sniffed instead
+_IMAGE_MAGIC_PREFIXES = (
+  b"\xff\xd8\xff",  # JPEG
+  b"\x89PNG",  # PNG
+  b"GIF8",  # GIF
+)
+
+
+def _sniff_image_magic(prefix: bytes) -> bool:
+  """True when the first bytes look like a known image format."""
+  if prefix.startswith(_IMAGE_MAGIC_PREFIXES):
+    return True
+  # WebP: RIFF....WEBP
+  return prefix[:4] == b"RIFF" and prefix[8:12] == b"WEBP"
+
+
+# HEAD responses a fallback ranged GET may still salvage: servers that
+# disallow or refuse HEAD often serve GET for the same URL just fine
+_HEAD_REJECTED_STATUSES = frozenset((403, 405, 501))
+
+# Per-host concurrency cap for image validation: candidate URLs cluster on
+# a handful of CDNs, and pointing every worker at one host at once trades
+# throughput for 429s and connection resets. Hosts still run in parallel.
+_PER_HOST_CONCURRENCY = 8
+
+_host_sems_lock = threading.Lock()
+_host_sems: Dict[str, threading.Semaphore] = {}
+
+
+def _host_semaphore(url: str) -> threading.Semaphore:
+  """Return the shared semaphore bounding in-flight requests to url's host."""
+  try:
+    host = urlparse(url).netloc
+  except ValueError:
+    host = ""
+  with _host_sems_lock:
+    sem = _host_sems.get(host)
+    if sem is None:
+      sem = threading.Semaphore(_PER_HOST_CONCURRENCY)
+      _host_sems[host] = sem
+  return sem
+
+
+def _has_image_extension(url: str) -> bool:
+  """Fast-path check: does the URL path end in a known image extension?
+
+  Most CSE image results end in .jpg/.png etc., so the HEAD request only
+  earns its RTT for ambiguous URLs (query-string-only, no extension). A
+  stale link slipping through costs one broken image in the UI, the same
+  failure mode as a URL going dead after validation.
+  """
+  try:
+    return urlparse(url).path.lower().endswith(_IMAGE_EXTENSIONS)
+  except ValueError:
+    return False
+
+
+# In-memory TTL cache for Google CSE results. Searches are pure functions of
+# their inputs over a slowly-changing index, so repeated queries (the same
+# figure names recur across user sessions) can skip the ~300ms paid API call.
+# Empty results get a short TTL so a transient API failure isn't memoized
+# for a day.
+_SEARCH_CACHE_TTL_SECONDS = 86400  # 24 hours
+_SEARCH_CACHE_EMPTY_TTL_SECONDS = 300  # 5 minutes for negative results
+_SEARCH_CACHE_MAX_ENTRIES = 4096
+
+_search_cache: Dict[Tuple, Tuple[float, Any]] = {}
+_search_cache_lock = threading.Lock()
+
+# On-disk layer under the in-memory cache so results survive process
+# restarts: each search spends paid API quota against a slowly-changing
+# index, so a 7-day TTL is safe. Negative results stay memory-only.
+_DISK_CACHE_DIR = Path.home() / ".cache" / "kindred"
+_DISK_CACHE_PATH = str(_DISK_CACHE_DIR / "cse_cache")
+_DISK_CACHE_TTL_SECONDS = 7 * 86400
+
+_disk_cache = None
+_disk_cache_failed = False
+
+
+def _get_disk_cache():
+  """Open the shelve lazily; callers must hold _search_cache_lock."""
+  global _disk_cache, _disk_cache_failed
+  if _disk_cache is None and not _disk_cache_failed:
+    if multiprocessing.parent_process() is not None:
+      # Pool workers (e.g. populate_database_initial's ProcessPoolExecutor)
+      # would each open the same dbm file writable, and concurrent writers
+      # can corrupt it; workers run with the in-memory cache only
+      _disk_cache_failed = True
+      return None
+    try:
+      _DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+      _disk_cache = shelve.open(_DISK_CACHE_PATH)
+      atexit.register(_disk_cache.close)
+    except Exception:
+      # Unwritable home dir etc. - run with the in-memory cache only
+      _disk_cache_failed = True
+  return _disk_cache
+
+
+def _disk_cache_key(key: Tuple) -> str:
+  return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _search_cache_get(key: Tuple) -> Optional[Any]:
+  """Return the cached value for key, or None on miss/expiry."""
+  global _disk_cache_failed
+  with _search_cache_lock:
+    entry = _search_cache.get(key)
+    if entry is not None:
+      expires_at, value = entry
+      if time.time() <= expires_at:
+        return value
+      del _search_cache[key]
+
+    # Memory miss: a previous run may have persisted the result
+    disk = _get_disk_cache()
+    if disk is not None:
+      try:
+        record = disk.get(_disk_cache_key(key))
+      except Exception:
+        # Corrupt dbm file etc. - degrade to the in-memory cache
+        _disk_cache_failed = True
+        record = None
+      if (
+        record
+        and record.get("value")
+        and time.time() - record.get("ts", 0) <= _DISK_CACHE_TTL_SECONDS
+      ):
+        _search_cache[key] = (time.time() + _SEARCH_CACHE_TTL_SECONDS, record["value"])
+        return record["value"]
+    return None
+
+
+def _search_cache_put(key: Tuple, value: Any) -> None:
+  """Cache a search result, evicting the soonest-to-expire entries if full."""
+  global _disk_cache_failed
+  ttl = _SEARCH_CACHE_TTL_SECONDS if value else _SEARCH_CACHE_EMPTY_TTL_SECONDS
+
+  with _search_cache_lock:
+    if len(_search_cache) >= _SEARCH_CACHE_MAX_ENTRIES:
+      sorted_keys = sorted(_search_cache.keys(), key=lambda k: _search_cache[k][0])
+      num_to_remove = max(1, len(sorted_keys) // 10)
+      for stale_key in sorted_keys[:num_to_remove]:
+        del _search_cache[stale_key]
+
+    _search_cache[key] = (time.time() + ttl, value)
+
+    if value:
+      disk = _get_disk_cache()
+      if disk is not None:
+        try:
+          disk[_disk_cache_key(key)] = {"ts": time.time(), "value": value}
+        except Exception:
+          # Never let a broken shelve escape: the search error paths call
+          # this inside their except handlers, and a write failure there
+          # would replace the original exception
+          _disk_cache_failed = True
+
+
+def clear_search_cache() -> None:
+  """Drop cached search results (memory and disk) so fresh API calls run."""
+  with _search_cache_lock:
+    _search_cache.clear()
+    disk = _get_disk_cache()
+    if disk is not None:
+      disk.clear()
+
+
+# Shared client settings for the batched async search paths. One HTTP/2
+# connection to googleapis.com multiplexes all queries in a batch, so N
+# searches cost ~1 TLS handshake + RTT after warmup instead of N.
+_ASYNC_CLIENT_LIMITS = httpx.Limits(
+  max_connections=20,
+  max_keepalive_connections=20,
+  keepalive_expiry=30.0,
+)
+
+
+def _make_async_client() -> httpx.AsyncClient:
+  """Create the HTTP/2 client used by the batch search entry points.
+
+  Created per batch rather than at module scope because httpx clients are
+  bound to the event loop they first run on, and each asyncio.run() call
+  uses a fresh loop.
+  """
+  return httpx.AsyncClient(http2=True, limits=_ASYNC_CLIENT_LIMITS, timeout=10)
 
 
 def validate_image_url(url: str, timeout: int = 5) -> bool:
@@ -16,46 +265,168 @@ def validate_image_url(url: str, timeout: int = 5) -> bool:
   Returns:
       True if the URL points to a valid image, False otherwise
   """
+  if _has_image_extension(url):
+    return True
+
   try:
-    # Make a HEAD request to check content type without downloading the full image
-    response = requests.head(url, timeout=timeout, allow_redirects=True)
+    # Make a HEAD request to check content type without downloading the full
+    # image. Split connect/read timeouts so a host that won't even accept the
+    # connection fails in 3s instead of holding the full read budget.
+    with _host_semaphore(url):
+      response = _sync_validation_client.head(
+        url, timeout=httpx.Timeout(timeout, connect=3.0)
+      )
+
+      # Some servers refuse HEAD outright; retry with a 1KB ranged GET and
+      # sniff the magic bytes instead of downloading the whole image
+      if response.status_code in _HEAD_REJECTED_STATUSES:
+        return _validate_with_ranged_get(url, timeout)
 
     # Check if the response is successful
-    if response.status_code != 200:
+    if response.status_code not in (200, 206):
       return False
 
-    # Check if the content-type indicates an image
-    content_type = response.headers.get("Content-Type", "").lower()
-    valid_image_types = [
-      "image/jpeg",
-      "image/jpg",
-      "image/png",
-      "image/gif",
-      "image/webp",
-      "image/bmp",
-    ]
+    # Check if the content-type indicates an image: parse the MIME once and
+    # do an O(1) set lookup instead of substring-scanning each valid type
+    content_type = response.headers.get("Content-Type", "")
+    mime = content_type.split(";", 1)[0].strip().lower()
+    return mime in _VALID_IMAGE_TYPES
+  except Exception:
+    # If any error occurs (timeout, connection error, etc.), consider it invalid
+    return False
+
 
-    if any(img_type in content_type for img_type in valid_image_types):
-      return True
+def _validate_with_ranged_get(url: str, timeout: int) -> bool:
+  """Fallback validation for servers that reject HEAD requests.
 
-    return False
+  A Range header keeps the transfer to ~1KB instead of a multi-MB image,
+  and only the first 16 bytes are read to match known magic numbers.
+  """
+  try:
+    with _sync_validation_client.stream(
+      "GET",
+      url,
+      headers={"Range": "bytes=0-1023"},
+      timeout=httpx.Timeout(timeout, connect=3.0),
+    ) as response:
+      if response.status_code not in (200, 206):
+        return False
+      prefix = b""
+      for chunk in response.iter_bytes(16):
+        prefix = chunk
+        break
+      return _sniff_image_magic(prefix)
   except Exception:
-    # If any error occurs (timeout, connection error, etc.), consider it invalid
     return False
 
 
+async def _validate_images_async(
+  candidate_urls: List[str],
+  num_valid_needed: int,
+  timeout_per_image: int,
+  client: Optional[httpx.AsyncClient] = None,
+) -> List[str]:
+  """Validate image URLs concurrently over one HTTP/2 client.
+
+  CSE candidates cluster on a handful of CDN origins (Wikimedia etc.), so
+  HTTP/2 multiplexing runs many HEAD requests over one TCP+TLS connection
+  per origin instead of one socket each. Pending requests are cancelled as
+  soon as enough valid URLs are found.
+
+  Args:
+      candidate_urls: URLs to validate
+      num_valid_needed: Stop after finding this many valid URLs
+      timeout_per_image: Timeout for each HEAD request in seconds
+      client: Existing client to share (e.g. from a batch search); a
+          temporary one is created when omitted
+  """
+  owns_client = client is None
+  if owns_client:
+    client = _make_async_client()
+
+  try:
+    # Same per-host cap as the sync path, but with loop-local semaphores
+    # (asyncio primitives are bound to the running event loop)
+    host_sems: Dict[str, asyncio.Semaphore] = {}
+
+    def _async_host_semaphore(url: str) -> asyncio.Semaphore:
+      try:
+        host = urlparse(url).netloc
+      except ValueError:
+        host = ""
+      sem = host_sems.get(host)
+      if sem is None:
+        sem = asyncio.Semaphore(_PER_HOST_CONCURRENCY)
+        host_sems[host] = sem
+      return sem
+
+    async def check(index: int, url: str) -> Optional[Tuple[int, str]]:
+      if _has_image_extension(url):
+        return (index, url)
+      try:
+        async with _async_host_semaphore(url):
+          response = await client.head(
+            url, timeout=timeout_per_image, follow_redirects=True
+          )
+        if response.status_code in _HEAD_REJECTED_STATUSES:
+          # Same ranged-GET fallback as the sync path: ~1KB transfer,
+          # magic-byte sniff instead of trusting Content-Type
+          async with _async_host_semaphore(url):
+            ranged = await client.get(
+              url,
+              headers={"Range": "bytes=0-1023"},
+              timeout=timeout_per_image,
+              follow_redirects=True,
+            )
+          ok = ranged.status_code in (200, 206) and _sniff_image_magic(
+            ranged.content[:16]
+          )
+          return (index, url) if ok else None
+        if response.status_code not in (200, 206):
+          return None
+        content_type = response.headers.get("Content-Type", "")
+        mime = content_type.split(";", 1)[0].strip().lower()
+        return (index, url) if mime in _VALID_IMAGE_TYPES else None
+      except Exception:
+        # Timeout, connection error, etc. - consider the URL invalid
+        return None
+
+    tasks = [asyncio.create_task(check(i, url)) for i, url in enumerate(candidate_urls)]
+    valid_urls: List[Tuple[int, str]] = []
+
+    try:
+      for future in asyncio.as_completed(tasks):
+        result = await future
+        if result:
+          valid_urls.append(result)
+          if len(valid_urls) >= num_valid_needed:
+            break
+    finally:
+      # Cancel whatever is still in flight once we have enough
+      for task in tasks:
+        task.cancel()
+      await asyncio.gather(*tasks, return_exceptions=True)
+  finally:
+    if owns_client:
+      await client.aclose()
+
+  valid_urls.sort(key=lambda x: x[0])
+  return [url for _, url in valid_urls]
+
+
 def validate_images_parallel(
   candidate_urls: List[str],
   num_valid_needed: int = 1,
   max_workers: int = 5,
   timeout_per_image: int = 5,
 ) -> List[str]:
-  """Validate multiple image URLs in parallel, return first N valid ones.
+  """Validate multiple image URLs concurrently, return first N valid ones.
 
   Args:
       candidate_urls: List of URLs to validate
       num_valid_needed: Stop after finding this many valid URLs
-      max_workers: Number of concurrent validation threads
+      max_workers: Unused; kept for backward compatibility (concurrency is
+          governed by the shared httpx client limits)
       timeout_per_image: Timeout for each HEAD request
 
   Returns:
@@ -64,29 +435,9 @@ def validate_images_parallel(
   if not candidate_urls:
     return []
 
-  valid_urls = []
-  url_to_index = {url: i for i, url in enumerate(candidate_urls)}
-
-  with ThreadPoolExecutor(max_workers=max_workers) as executor:
-    future_to_url = {
-      executor.submit(validate_image_url, url, timeout_per_image): url
-      for url in candidate_urls
-    }
-
-    for future in as_completed(future_to_url):
-      url = future_to_url[future]
-      try:
-        if future.result():
-          valid_urls.append((url_to_index[url], url))
-          if len(valid_urls) >= num_valid_needed:
-            for f in future_to_url:
-              f.cancel()
-            break
-      except Exception:
-        pass
-
-  valid_urls.sort(key=lambda x: x[0])
-  return [url for _, url in valid_urls]
+  return asyncio.run(
+    _validate_images_async(candidate_urls, num_valid_needed, timeout_per_image)
+  )
 
 
 def search_images_google(query: str, num_images: int = 4) -> List[str]:
@@ -108,6 +459,12 @@ def search_images_google(query: str, num_images: int = 4) -> List[str]:
     )
     return []
 
+  cache_key = ("image", query, num_images)
+  cached = _search_cache_get(cache_key)
+  if cached is not None:
+    print(f"  [CACHE HIT] Google Image Search for '{query}'")
+    return cached
+
   url = "https://www.googleapis.com/customsearch/v1"
   params = {
     "key": api_key,
@@ -120,7 +477,7 @@ def search_images_google(query: str, num_images: int = 4) -> List[str]:
   print(f"  [API CALL] Google Image Search for '{query}'")
   start_time = time.perf_counter()
   try:
-    response = requests.get(url, params=params, timeout=10)
+    response = _session.get(url, params=params, timeout=10)
     print(
       f"    [TIMING] Google Image Search API: {time.perf_counter() - start_time:.3f}s"
     )
@@ -144,11 +501,91 @@ def search_images_google(query: str, num_images: int = 4) -> List[str]:
       f"    [TIMING] Parallel URL validation: {time.perf_counter() - validation_start:.3f}s"
     )
     print(f"    Returning {len(validated_urls)} validated image URLs")
+    _search_cache_put(cache_key, validated_urls)
     return validated_urls
   except Exception as e:
     print(f"Error in image search: {e}")
+    _search_cache_put(cache_key, [])  # negative cache, short TTL
+    return []
+
+
+async def _search_images_one(
+  client: httpx.AsyncClient, query: str, num_images: int
+) -> List[str]:
+  """Async body of search_images_google for one query, sharing a client."""
+  api_key = os.getenv("GOOGLE_CSE_API_KEY")
+  cse_id = os.getenv("GOOGLE_CSE_ID")
+
+  if not api_key or not cse_id:
+    print(
+      "  Warning: GOOGLE_CSE_API_KEY or GOOGLE_CSE_ID not configured. Skipping image search."
+    )
     return []
 
+  cache_key = ("image", query, num_images)
+  cached = _search_cache_get(cache_key)
+  if cached is not None:
+    print(f"  [CACHE HIT] Google Image Search for '{query}'")
+    return cached
+
+  params = {
+    "key": api_key,
+    "cx": cse_id,
+    "q": query,
+    "searchType": "image",
+    "num": 10,  # Request max to have more candidates for validation
+  }
+
+  print(f"  [API CALL] Google Image Search for '{query}'")
+  try:
+    response = await client.get(
+      "https://www.googleapis.com/customsearch/v1", params=params
+    )
+    response.raise_for_status()
+
+    items = response.json().get("items", [])
+    candidate_urls = [item.get("link") for item in items if item.get("link")]
+
+    validated_urls = await _validate_images_async(
+      candidate_urls, num_images, 5, client=client
+    )
+    _search_cache_put(cache_key, validated_urls)
+    return validated_urls
+  except Exception as e:
+    print(f"Error in image search: {e}")
+    _search_cache_put(cache_key, [])  # negative cache, short TTL
+    return []
+
+
+def search_images_google_batch(
+  queries: List[str], num_images: int = 4
+) -> List[List[str]]:
+  """Run several image searches concurrently over one HTTP/2 connection.
+
+  Args:
+      queries: Search query strings
+      num_images: Number of validated images to return per query
+
+  Returns:
+      List of validated-URL lists, one per query, in input order
+  """
+  if not queries:
+    return []
+
+  async def run_batch():
+    async with _make_async_client() as client:
+      return await asyncio.gather(
+        *(_search_images_one(client, q, num_images) for q in queries)
+      )
+
+  start_time = time.perf_counter()
+  results = asyncio.run(run_batch())
+  print(
+    f"    [TIMING] Batched image search ({len(queries)} queries): "
+    f"{time.perf_counter() - start_time:.3f}s"
+  )
+  return list(results)
+
 
 def google_search_text(query: str, num_results: int = 5) -> str:
   """Perform a Google text search."""
@@ -158,11 +595,16 @@ def google_search_text(query: str, num_results: int = 5) -> str:
   if not api_key or not cse_id:
     return "Search API keys missing."
 
+  cache_key = ("text", query, num_results)
+  cached = _search_cache_get(cache_key)
+  if cached is not None:
+    return cached
+
   url = "https://www.googleapis.com/customsearch/v1"
   params = {"key": api_key, "cx": cse_id, "q": query, "num": min(num_results, 10)}
 
   try:
-    response = requests.get(url, params=params, timeout=10)
+    response = _session.get(url, params=params, timeout=10)
     response.raise_for_status()
     data = response.json()
 
@@ -172,6 +614,9 @@ def google_search_text(query: str, num_results: int = 5) -> str:
       snippet = item.get("snippet", "")
       results.append(f"Title: {title}\nSnippet: {snippet}\n")
 
-    return "\n".join(results)
+    formatted = "\n".join(results)
+    _search_cache_put(cache_key, formatted)
+    return formatted
   except Exception as e:
+    # Failures are returned but not cached, so the next call retries
     return f"Search failed: {e}"
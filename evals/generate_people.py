@@ -14,21 +14,38 @@ Usage:
 """
 
 import argparse
-import json
+import asyncio
+import gzip
+import hashlib
 import os
+import pickle
 import sys
+from collections import Counter
 from datetime import datetime
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.agent import (
+  RateLimiter,
   StoryGeneratorAgent,
   sample_demographic_combinations,
   search_figures_for_demographic_gemini,
 )
 
+# Rejection categories reported by search_figures_for_demographic_gemini
+_REJECTION_REASONS = (
+  "too_long",
+  "sentence_pattern",
+  "wrong_word_count",
+  "non_name_pattern",
+  "bad_start",
+)
+
 # Test cases - same as backend/generate_examples.py
 TEST_CASES = {
   "example_0": "I am Mexican. I am a neuroscientist. I crossed the border to the USA when I was 12. I think a lot about how to be a more compassionate person and have to move with compassion I feel the suffering of others a lot and I want to make something out of that something good out of it.",
@@ -55,17 +72,97 @@ TEST_CASES = {
 }
 
 
+# Concurrent Gemini searches per example; bounds the fan-out so the eval
+# stays under the model's requests-per-minute quota
+MAX_CONCURRENT_SEARCHES = 8
+
+# On-disk cache for extracted demographics, keyed by a hash of the input
+# text; TEST_CASES is fixed, so repeat runs skip the extraction LLM calls
+_DEMO_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".demo_cache")
+
+
+def _extract_demographics_cached(agent: StoryGeneratorAgent, description: str):
+  """Extract demographics for one description, caching the result on disk.
+
+  Delete evals/.demo_cache to force re-extraction (e.g. after changing
+  the extraction prompt or model).
+  """
+  key = hashlib.blake2b(description.encode("utf-8"), digest_size=16).hexdigest()
+  path = os.path.join(_DEMO_CACHE_DIR, f"{key}.pkl")
+
+  if os.path.exists(path):
+    try:
+      with open(path, "rb") as f:
+        return pickle.load(f)
+    except Exception:
+      pass  # unreadable cache entry; fall through and recompute
+
+  demographics = agent.extract_demographics_from_text(description)
+
+  os.makedirs(_DEMO_CACHE_DIR, exist_ok=True)
+  with open(path, "wb") as f:
+    pickle.dump(demographics, f)
+
+  return demographics
+
+
+async def _search_combos_concurrently(
+  agent: StoryGeneratorAgent,
+  demographics,
+  samples: List[Tuple[str, Dict[str, str]]],
+  rate_limiter: Optional[RateLimiter] = None,
+) -> List[Any]:
+  """Run one Gemini search per combo concurrently, bounded by a semaphore.
+
+  The searches are independent I/O-bound API calls, so dispatching them
+  together collapses per-example wall time from sum(latency) to roughly
+  max(latency). Results come back in sample order. When a rate_limiter
+  is given, each search acquires a token first (inside its worker
+  thread, so waiting never blocks the event loop).
+  """
+  sem = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+  def search_one(demo_dict: Dict[str, str]):
+    if rate_limiter is not None:
+      rate_limiter.acquire()
+    return search_figures_for_demographic_gemini(
+      demographic_dict=demo_dict,
+      goals=demographics.goals(),
+      limit=3,
+      lm=agent.lm,
+      return_metrics=True,
+    )
+
+  async def run_one(demo_dict: Dict[str, str]):
+    async with sem:
+      return await asyncio.to_thread(search_one, demo_dict)
+
+  return await asyncio.gather(*(run_one(demo_dict) for _, demo_dict in samples))
+
+
 def run_eval(
   num_examples: int = 3,
   num_combos: int = 5,
+  combo_log_path: Optional[str] = None,
+  rpm: Optional[int] = None,
 ) -> Dict[str, Any]:
-  """Run evaluation and collect metrics."""
+  """Run evaluation and collect metrics.
+
+  When combo_log_path is given, per-combination records are streamed to
+  that file as NDJSON (one record per line) instead of being accumulated
+  in the returned dict; long runs then use constant memory for the
+  per-combo data while aggregates stay in memory as before.
+  """
   print(f"\n{'=' * 60}")
   print(f"RUNNING EVALUATION: {num_examples} examples x {num_combos} combos")
   print(f"{'=' * 60}\n")
 
   agent = StoryGeneratorAgent()
 
+  # One shared token bucket across all examples, so total request rate
+  # stays under the quota regardless of per-example concurrency
+  rate_limiter = RateLimiter(requests_per_minute=rpm) if rpm else None
+
   results: Dict[str, Any] = {
     "timestamp": datetime.now().isoformat(),
     "config": {"num_examples": num_examples, "num_combos": num_combos},
@@ -74,36 +171,44 @@ def run_eval(
     "per_combination": [],
     "sample_rejections": {},
   }
+  if combo_log_path:
+    results["config"]["per_combination_log"] = os.path.basename(combo_log_path)
+  combo_log = open(combo_log_path, "wb") if combo_log_path else None
 
   total_raw = 0
   total_valid = 0
-  total_rejections: Dict[str, int] = {
-    "too_long": 0,
-    "sentence_pattern": 0,
-    "wrong_word_count": 0,
-    "non_name_pattern": 0,
-    "bad_start": 0,
-  }
+  total_rejections: Counter = Counter(dict.fromkeys(_REJECTION_REASONS, 0))
   sample_rejections: Dict[str, List[str]] = {
-    "too_long": [],
-    "sentence_pattern": [],
-    "wrong_word_count": [],
-    "non_name_pattern": [],
-    "bad_start": [],
+    reason: [] for reason in _REJECTION_REASONS
   }
 
+  # Only the cardinality of the global name set is reported, so keep
+  # 64-bit string hashes rather than the full name strings
   all_unique_names: set = set()
   combos_with_at_least_one_name = 0
   total_combos = 0
 
-  for key, description in list(TEST_CASES.items())[:num_examples]:
+  cases = list(TEST_CASES.items())[:num_examples]
+
+  # 1. Extract demographics for every example concurrently: each is an
+  # independent LLM call, so the extraction phase costs one round-trip
+  # instead of one per example
+  async def _extract_all():
+    return await asyncio.gather(
+      *(
+        asyncio.to_thread(_extract_demographics_cached, agent, description)
+        for _, description in cases
+      )
+    )
+
+  print(f"Extracting demographics for {len(cases)} examples concurrently...")
+  demographics_list = asyncio.run(_extract_all())
+
+  for (key, description), demographics in zip(cases, demographics_list):
     print(f"\n{'=' * 40}")
     print(f"Processing: {key}")
     print(f"{'=' * 40}")
 
-    # 1. Extract demographics
-    demographics = agent.extract_demographics_from_text(description)
-
     # 2. Sample combinations
     samples = sample_demographic_combinations(
       demographics, num_attribution_combinations=num_combos
@@ -122,16 +227,15 @@ def run_eval(
 
     example_unique_names: set = set()
 
-    # 3. Run search for each combination with metrics
-    for demo_str, demo_dict in samples:
-      total_combos += 1
-      metrics = search_figures_for_demographic_gemini(
-        demographic_dict=demo_dict,
-        goals=demographics.goals(),
-        limit=3,
-        lm=agent.lm,
-        return_metrics=True,
+    # 3. Run the searches for all combinations concurrently
+    metrics_list = asyncio.run(
+      _search_combos_concurrently(
+        agent, demographics, samples, rate_limiter=rate_limiter
       )
+    )
+
+    for (demo_str, demo_dict), metrics in zip(samples, metrics_list):
+      total_combos += 1
 
       # Type guard - metrics is dict when return_metrics=True
       if not isinstance(metrics, dict):
@@ -148,34 +252,42 @@ def run_eval(
         combos_with_at_least_one_name += 1
 
       # Aggregate rejections
+      total_rejections.update(
+        {reason: len(lst) for reason, lst in metrics["rejections"].items()}
+      )
+      # Collect samples (max 5 per category) without walking past the cap
       for reason, rejected_list in metrics["rejections"].items():
-        total_rejections[reason] += len(rejected_list)
-        # Collect samples (max 5 per category)
-        for text in rejected_list:
-          if len(sample_rejections[reason]) < 5:
-            sample_rejections[reason].append(text)
+        kept = sample_rejections[reason]
+        if len(kept) < 5:
+          kept.extend(islice(rejected_list, 5 - len(kept)))
 
       # Store per-combo results
-      results["per_combination"].append(
-        {
-          "example": key,
-          "demographic": demo_dict,
-          "raw_count": raw_count,
-          "valid_count": valid_count,
-          "rejections": {k: len(v) for k, v in metrics["rejections"].items()},
-          "gemini_time_ms": metrics["gemini_time_ms"],
-          "valid_names": metrics["valid_names"],
-        }
-      )
+      record = {
+        "example": key,
+        "demographic": demo_dict,
+        "raw_count": raw_count,
+        "valid_count": valid_count,
+        "rejections": {k: len(v) for k, v in metrics["rejections"].items()},
+        "gemini_time_ms": metrics["gemini_time_ms"],
+        "valid_names": metrics["valid_names"],
+      }
+      if combo_log is not None:
+        combo_log.write(orjson.dumps(record))
+        combo_log.write(b"\n")
+      else:
+        results["per_combination"].append(record)
 
       example_results["raw_names"] += raw_count
       example_results["valid_names"] += valid_count
       example_unique_names.update(metrics["valid_names"])
-      all_unique_names.update(metrics["valid_names"])
+      all_unique_names.update(hash(name) for name in metrics["valid_names"])
 
     example_results["unique_names"] = list(example_unique_names)
     results["per_example"].append(example_results)
 
+  if combo_log is not None:
+    combo_log.close()
+
   # Calculate aggregates
   waste_rate = (total_raw - total_valid) / total_raw if total_raw > 0 else 0
   api_efficiency = total_valid / total_combos if total_combos > 0 else 0
@@ -195,7 +307,7 @@ def run_eval(
     "api_efficiency": api_efficiency,
     "combo_success_rate": combo_success_rate,
     "dedup_rate": dedup_rate,
-    "rejection_breakdown": total_rejections,
+    "rejection_breakdown": dict(total_rejections),
   }
 
   results["sample_rejections"] = sample_rejections
@@ -258,17 +370,35 @@ def print_summary(results: Dict[str, Any]) -> None:
   print("\n" + "=" * 60)
 
 
-def save_results(results: Dict[str, Any]) -> str:
-  """Save results to JSON file."""
+def _eval_output_path(prefix: str, ext: str) -> str:
+  """Return a timestamped path under evals/eval_results, creating the dir."""
   output_dir = os.path.join(os.path.dirname(__file__), "eval_results")
   os.makedirs(output_dir, exist_ok=True)
 
   timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-  filename = f"generate_{timestamp}.json"
-  filepath = os.path.join(output_dir, filename)
-
-  with open(filepath, "w") as f:
-    json.dump(results, f, indent=2)
+  return os.path.join(output_dir, f"{prefix}_{timestamp}.{ext}")
+
+
+def save_results(results: Dict[str, Any], compress: bool = True) -> str:
+  """Save results to a JSON file, gzipped by default.
+
+  The payload is written to a sibling .tmp file and moved into place
+  with os.replace, so an interrupted run never leaves a truncated
+  results file behind.
+  """
+  filepath = _eval_output_path("generate", "json.gz" if compress else "json")
+
+  # orjson serializes the large per-combination payload in one C pass,
+  # avoiding the stdlib encoder's per-object Python overhead
+  payload = orjson.dumps(results, option=orjson.OPT_INDENT_2)
+  tmp_path = filepath + ".tmp"
+  if compress:
+    with gzip.open(tmp_path, "wb") as f:
+      f.write(payload)
+  else:
+    with open(tmp_path, "wb") as f:
+      f.write(payload)
+  os.replace(tmp_path, filepath)
 
   return filepath
 
@@ -292,14 +422,29 @@ def main():
     action="store_true",
     help="Save results to JSON file",
   )
+  parser.add_argument(
+    "--no-compress",
+    action="store_true",
+    help="Save results as plain JSON instead of gzip",
+  )
+  parser.add_argument(
+    "--rpm",
+    type=int,
+    default=None,
+    help="Cap search requests per minute (default: unlimited)",
+  )
   args = parser.parse_args()
 
-  results = run_eval(args.examples, args.combos)
+  combo_log_path = _eval_output_path("generate_combos", "ndjson") if args.save else None
+  results = run_eval(
+    args.examples, args.combos, combo_log_path=combo_log_path, rpm=args.rpm
+  )
   print_summary(results)
 
   if args.save:
-    filepath = save_results(results)
+    filepath = save_results(results, compress=not args.no_compress)
     print(f"\nResults saved to: {filepath}")
+    print(f"Per-combination records streamed to: {combo_log_path}")
 
 
 if __name__ == "__main__":
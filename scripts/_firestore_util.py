@@ -0,0 +1,57 @@
+"""Shared Firestore bootstrap for the maintenance scripts.
+
+Each script used to carry its own copy of the credential-resolution and
+firebase_admin initialization block; this module holds the single
+memoized version so the app and client are built at most once per
+process no matter how many script entry points call it.
+"""
+
+import os
+
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+_db = None
+
+
+def get_db():
+  """Initialize Firebase if needed and return a memoized Firestore client.
+
+  Returns None (after printing the reason) when credentials are missing
+  or initialization fails, matching the scripts' existing behavior of
+  printing and bailing out.
+  """
+  global _db
+  if _db is not None:
+    return _db
+
+  cred_path = os.path.expanduser("~/firebase-keys/kindred-histories-firebase-key.json")
+
+  if os.path.exists(cred_path):
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
+    print(f"Using credentials from {cred_path}")
+  elif os.path.exists("service-account-key.json"):
+    cred_path = "service-account-key.json"
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
+    print(f"Using credentials from {cred_path}")
+  else:
+    print("Error: No Firebase credentials found!")
+    return None
+
+  if not firebase_admin._apps:
+    try:
+      cred = credentials.Certificate(cred_path)
+      firebase_admin.initialize_app(cred)
+      print("Firebase initialized successfully")
+    except Exception as e:
+      print(f"Failed to initialize Firebase: {e}")
+      return None
+
+  try:
+    _db = firestore.client()
+    print("Connected to Firestore database")
+  except Exception as e:
+    print(f"Firestore client creation failed: {e}")
+    return None
+
+  return _db
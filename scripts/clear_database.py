@@ -6,9 +6,16 @@ Usage:
     uv run python clear_database.py
 """
 import os
+import sys
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+# Make the shared bootstrap importable whether the script runs from the
+# repo root or from inside scripts/
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _firestore_util import get_db  # noqa: E402
+
+# Firestore allows up to 500 operations per batch commit
+FIRESTORE_BATCH_LIMIT = 500
 
 
 def clear_all_figures():
@@ -17,41 +24,15 @@ def clear_all_figures():
   Preserves figures where initial=True (pre-populated figures).
   Only deletes figures where initial=False or initial field is missing.
   """
-  # Initialize Firebase
-  cred_path = os.path.expanduser("~/firebase-keys/kindred-histories-firebase-key.json")
-
-  if os.path.exists(cred_path):
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
-    print(f"Using credentials from {cred_path}")
-  elif os.path.exists("service-account-key.json"):
-    cred_path = "service-account-key.json"
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_path
-    print(f"Using credentials from {cred_path}")
-  else:
-    print("Error: No Firebase credentials found!")
-    return
-
-  # Initialize Firebase app if not already initialized
-  if not firebase_admin._apps:
-    try:
-      cred = credentials.Certificate(cred_path)
-      firebase_admin.initialize_app(cred)
-      print("Firebase initialized successfully")
-    except Exception as e:
-      print(f"Failed to initialize Firebase: {e}")
-      return
-
-  # Get Firestore client
-  try:
-    db = firestore.client()
-    print("Connected to Firestore database")
-  except Exception as e:
-    print(f"Firestore client creation failed: {e}")
+  db = get_db()
+  if not db:
     return
 
-  # Get all documents in the collection
+  # Get all documents in the collection. Only the "initial" flag is read
+  # before deletion, so project it server-side instead of pulling full
+  # documents (bios, embeddings) over the wire
   collection_ref = db.collection("historical_figures")
-  docs = collection_ref.stream()
+  docs = collection_ref.select(["initial"]).stream()
 
   # Separate initial from non-initial figures
   doc_list = list(docs)
@@ -86,18 +67,22 @@ def clear_all_figures():
     print("Deletion cancelled.")
     return
 
-  # Delete non-initial documents
+  # Delete non-initial documents in committed batches, so N documents cost
+  # ceil(N/500) RPC round-trips instead of one each
   print("\nDeleting non-initial documents...")
   deleted_count = 0
 
-  for doc in non_initial_docs:
+  for i in range(0, non_initial_count, FIRESTORE_BATCH_LIMIT):
+    chunk = non_initial_docs[i : i + FIRESTORE_BATCH_LIMIT]
+    batch = db.batch()
+    for doc in chunk:
+      batch.delete(doc.reference)
     try:
-      doc.reference.delete()
-      deleted_count += 1
-      if deleted_count % 10 == 0:
-        print(f"  Deleted {deleted_count}/{non_initial_count} documents...")
+      batch.commit()
+      deleted_count += len(chunk)
+      print(f"  Deleted {deleted_count}/{non_initial_count} documents...")
     except Exception as e:
-      print(f"  Error deleting {doc.id}: {e}")
+      print(f"  Error committing delete batch starting at {i}: {e}")
 
   print(f"\n{'='*60}")
   print(f"✓ Successfully deleted {deleted_count} non-initial documents")
@@ -11,20 +11,50 @@ Usage:
     uv run python setup_secrets.py
 """
 
-import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from configparser import ConfigParser
 from pathlib import Path
 
 # Try to import dotenv
 try:
-    from dotenv import load_dotenv
+    from dotenv import dotenv_values
 except ImportError:
     print("ERROR: python-dotenv not installed")
     print("Install with: pip install python-dotenv")
     print("Or: uv pip install python-dotenv")
     sys.exit(1)
 
+# Prefer the Secret Manager SDK: one authenticated gRPC channel is reused
+# across every describe/create/add-version call, instead of paying a fresh
+# gcloud subprocess (interpreter + auth, ~300ms) per operation. The gcloud
+# CLI path below remains as a fallback when the SDK is not installed.
+try:
+    import google.auth
+    from google.api_core.exceptions import NotFound
+    from google.cloud import secretmanager
+except ImportError:
+    secretmanager = None
+
+_sm_client = None
+_sm_client_failed = False
+
+
+def _get_sm_client():
+    """Return a shared SecretManagerServiceClient, or None if unavailable."""
+    global _sm_client, _sm_client_failed
+    if secretmanager is None or _sm_client_failed:
+        return None
+    if _sm_client is None:
+        try:
+            _sm_client = secretmanager.SecretManagerServiceClient()
+        except Exception as e:
+            print(f"⚠️  Secret Manager SDK unavailable ({e}); falling back to gcloud")
+            _sm_client_failed = True
+            return None
+    return _sm_client
+
 
 def run_command(cmd, input_data=None, check=True):
     """Run a shell command with optional stdin input."""
@@ -41,46 +71,115 @@ def run_command(cmd, input_data=None, check=True):
         return e.returncode, e.stdout, e.stderr
 
 
-def secret_exists(secret_name):
+def _project_id_from_gcloud_config():
+    """Read the project straight from gcloud's config INI, if present.
+
+    `gcloud config get-value project` spawns a full CLI subprocess just to
+    read this file, so parse it directly first.
+    """
+    config_dir = Path.home() / '.config' / 'gcloud'
+    config_name = 'default'
+    try:
+        active = (config_dir / 'active_config').read_text().strip()
+        if active:
+            config_name = active
+    except OSError:
+        pass
+
+    config = ConfigParser()
+    config.read(config_dir / 'configurations' / f'config_{config_name}')
+    return config.get('core', 'project', fallback=None)
+
+
+def get_project_id():
+    """Resolve the active GCP project without spawning a subprocess when possible."""
+    project_id = _project_id_from_gcloud_config()
+    if project_id:
+        return project_id
+
+    if secretmanager is not None:
+        try:
+            _, project_id = google.auth.default()
+            if project_id:
+                return project_id
+        except Exception:
+            pass
+
+    returncode, stdout, _ = run_command(
+        ["gcloud", "config", "get-value", "project"], check=False
+    )
+    if returncode == 0 and stdout.strip():
+        return stdout.strip()
+    return None
+
+
+def secret_exists(secret_name, project_id):
     """Check if a secret already exists in Secret Manager."""
+    client = _get_sm_client()
+    if client is not None:
+        try:
+            client.get_secret(name=f"projects/{project_id}/secrets/{secret_name}")
+            return True
+        except NotFound:
+            return False
+
     cmd = ["gcloud", "secrets", "describe", secret_name]
     returncode, _, _ = run_command(cmd, check=False)
     return returncode == 0
 
 
-def create_secret(secret_name, secret_value):
-    """Create a secret in Google Cloud Secret Manager."""
-    if secret_exists(secret_name):
-        print(f"  ℹ️  Secret '{secret_name}' already exists")
-        response = input(f"     Do you want to add a new version? (y/N): ").strip().lower()
-
-        if response == 'y':
-            # Add new version to existing secret
-            cmd = ["gcloud", "secrets", "versions", "add", secret_name, "--data-file=-"]
-            returncode, stdout, stderr = run_command(cmd, input_data=secret_value)
-
-            if returncode == 0:
-                print(f"  ✅ Added new version to '{secret_name}'")
-                return True
-            else:
-                print(f"  ❌ Failed to add version to '{secret_name}'")
-                print(f"     Error: {stderr}")
-                return False
-        else:
-            print(f"  ⏭️  Skipping '{secret_name}'")
-            return True
-    else:
-        # Create new secret
-        cmd = ["gcloud", "secrets", "create", secret_name, "--data-file=-"]
-        returncode, stdout, stderr = run_command(cmd, input_data=secret_value)
-
-        if returncode == 0:
-            print(f"  ✅ Created secret '{secret_name}'")
-            return True
-        else:
-            print(f"  ❌ Failed to create secret '{secret_name}'")
-            print(f"     Error: {stderr}")
-            return False
+def _add_secret_version(secret_name, secret_value, project_id):
+    """Add a new version holding secret_value. Returns (ok, error_message)."""
+    client = _get_sm_client()
+    if client is not None:
+        try:
+            client.add_secret_version(
+                parent=f"projects/{project_id}/secrets/{secret_name}",
+                payload={"data": secret_value.encode("utf-8")},
+            )
+            return True, ""
+        except Exception as e:
+            return False, str(e)
+
+    cmd = ["gcloud", "secrets", "versions", "add", secret_name, "--data-file=-"]
+    returncode, _, stderr = run_command(cmd, input_data=secret_value)
+    return returncode == 0, stderr
+
+
+def _create_new_secret(secret_name, secret_value, project_id):
+    """Create a new secret and its first version. Returns (ok, error_message)."""
+    client = _get_sm_client()
+    if client is not None:
+        try:
+            client.create_secret(
+                parent=f"projects/{project_id}",
+                secret_id=secret_name,
+                secret={"replication": {"automatic": {}}},
+            )
+        except Exception as e:
+            return False, str(e)
+        return _add_secret_version(secret_name, secret_value, project_id)
+
+    cmd = ["gcloud", "secrets", "create", secret_name, "--data-file=-"]
+    returncode, _, stderr = run_command(cmd, input_data=secret_value)
+    return returncode == 0, stderr
+
+
+def apply_secret(secret_name, secret_value, mode, project_id):
+    """Create or version one secret, with no prompting or printing.
+
+    Safe to run from worker threads; returns (ok, printable message).
+    """
+    if mode == "add":
+        ok, stderr = _add_secret_version(secret_name, secret_value, project_id)
+        if ok:
+            return True, f"  ✅ Added new version to '{secret_name}'"
+        return False, f"  ❌ Failed to add version to '{secret_name}'\n     Error: {stderr}"
+
+    ok, stderr = _create_new_secret(secret_name, secret_value, project_id)
+    if ok:
+        return True, f"  ✅ Created secret '{secret_name}'"
+    return False, f"  ❌ Failed to create secret '{secret_name}'\n     Error: {stderr}"
 
 
 def main():
@@ -94,24 +193,25 @@ def main():
         print("   Make sure you're running this script from the repository root")
         sys.exit(1)
 
-    # Load environment variables
-    load_dotenv(env_path)
+    # Parse the .env file once into a plain dict; no need to round-trip
+    # the values through os.environ just to read them back per secret
+    env = dotenv_values(env_path)
 
-    # Check if gcloud is installed
-    returncode, _, _ = run_command(["gcloud", "--version"], check=False)
-    if returncode != 0:
-        print("\n❌ ERROR: gcloud CLI not found")
-        print("   Install from: https://cloud.google.com/sdk/docs/install")
-        sys.exit(1)
+    # The gcloud CLI is only required when the SDK path is unavailable
+    if _get_sm_client() is None:
+        returncode, _, _ = run_command(["gcloud", "--version"], check=False)
+        if returncode != 0:
+            print("\n❌ ERROR: gcloud CLI not found")
+            print("   Install from: https://cloud.google.com/sdk/docs/install")
+            sys.exit(1)
 
     # Get current project
-    returncode, stdout, stderr = run_command(["gcloud", "config", "get-value", "project"], check=False)
-    if returncode != 0 or not stdout.strip():
+    project_id = get_project_id()
+    if not project_id:
         print("\n❌ ERROR: No GCP project configured")
         print("   Set project with: gcloud config set project YOUR_PROJECT_ID")
         sys.exit(1)
 
-    project_id = stdout.strip()
     print(f"\n📍 Current GCP Project: {project_id}")
 
     # Confirm before proceeding
@@ -137,18 +237,48 @@ def main():
     success_count = 0
     failed_secrets = []
 
+    # Resolve all interactive decisions first, then upload concurrently:
+    # the Secret Manager round-trips overlap instead of being paid one
+    # after another
+    tasks = []  # (secret_name, secret_value, "create" | "add")
+
     for secret_name, env_var in secrets_map.items():
-        secret_value = os.getenv(env_var)
+        secret_value = env.get(env_var)
 
         if not secret_value:
             print(f"  ⚠️  Warning: {env_var} not found in .env file")
             failed_secrets.append(secret_name)
             continue
 
-        if create_secret(secret_name, secret_value):
-            success_count += 1
+        if secret_exists(secret_name, project_id):
+            print(f"  ℹ️  Secret '{secret_name}' already exists")
+            response = input(f"     Do you want to add a new version? (y/N): ").strip().lower()
+            if response == 'y':
+                tasks.append((secret_name, secret_value, "add"))
+            else:
+                print(f"  ⏭️  Skipping '{secret_name}'")
+                success_count += 1
         else:
-            failed_secrets.append(secret_name)
+            tasks.append((secret_name, secret_value, "create"))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = {
+            pool.submit(apply_secret, name, value, mode, project_id): name
+            for name, value, mode in tasks
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                ok, message = future.result()
+            except Exception as e:
+                ok, message = False, f"  ❌ Failed to configure '{name}': {e}"
+            print(message)
+            if ok:
+                success_count += 1
+            else:
+                failed_secrets.append(name)
+
+    failed_secrets.sort()
 
     # Summary
     print("\n" + "=" * 50)
@@ -7,13 +7,21 @@ import json
 
 API_BASE = "http://localhost:8000"
 
+# One keep-alive session across the tests: the second and later requests
+# reuse the loopback connection instead of handshaking again
+SESSION = requests.Session()
+SESSION.mount(
+    "http://",
+    requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4),
+)
+
 def test_facets_endpoint():
     """Test /api/facets"""
     print("=" * 60)
     print("Testing GET /api/facets")
     print("=" * 60)
 
-    response = requests.get(f"{API_BASE}/api/facets")
+    response = SESSION.get(f"{API_BASE}/api/facets")
     data = response.json()
 
     print(f"Status: {response.status_code}")
@@ -36,7 +44,7 @@ def test_semantic_search():
         "limit": 5
     }
 
-    response = requests.get(f"{API_BASE}/api/figures/semantic", params=params)
+    response = SESSION.get(f"{API_BASE}/api/figures/semantic", params=params)
     data = response.json()
 
     print(f"Status: {response.status_code}")
@@ -7,6 +7,14 @@ import json
 
 API_BASE = "http://localhost:8000"
 
+# One keep-alive session across the tests: the second and later requests
+# reuse the loopback connection instead of handshaking again
+SESSION = requests.Session()
+SESSION.mount(
+    "http://",
+    requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4),
+)
+
 def test_extract_facets():
     """Test facet extraction from user description."""
     print("=" * 60)
@@ -23,7 +31,7 @@ def test_extract_facets():
     print("\nTest 1: Mexican neuroscientist")
     print(f"Description: {description1.strip()[:100]}...")
 
-    response = requests.post(
+    response = SESSION.post(
         f"{API_BASE}/api/extract-facets",
         json={"text": description1}
     )
@@ -53,7 +61,7 @@ def test_extract_facets():
     print("\nTest 2: Non-binary coder from Atlanta")
     print(f"Description: {description2.strip()[:100]}...")
 
-    response = requests.post(
+    response = SESSION.post(
         f"{API_BASE}/api/extract-facets",
         json={"text": description2}
     )
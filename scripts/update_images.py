@@ -10,7 +10,10 @@ Usage:
 """
 
 import argparse
+import hashlib
+import shelve
 import sys
+import threading
 import time
 from pathlib import Path
 
@@ -23,11 +26,65 @@ sys.path.insert(0, str(project_root))
 # Load environment variables from .env file
 load_dotenv(project_root / ".env")
 
-from backend.database import db, get_all_figures  # noqa: E402
-from backend.tools import search_images_google  # noqa: E402
+from backend.database import (  # noqa: E402
+  db,
+  get_all_figures,
+  get_figures_missing_image,
+)
+from backend.tools import search_images_google_batch  # noqa: E402
 
 IMAGES_TO_SEARCH = 4
 
+# Firestore allows up to 500 operations per batch commit
+FIRESTORE_BATCH_LIMIT = 500
+
+# On-disk cache of query -> image url from previous runs: Google CSE is
+# effectively deterministic for an unchanged query, so idempotent re-runs
+# skip the search (and its quota cost) when the stored result still
+# matches the figure's current image
+QUERY_CACHE_PATH = str(Path(__file__).parent / ".image_query_cache")
+
+
+def _query_cache_key(image_query: str) -> str:
+  return hashlib.blake2b(image_query.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Searches run in batches over one HTTP/2 connection each, so their
+# latencies overlap, while a token bucket keeps the start rate inside
+# the Google CSE quota. Sized to the documented ~10 queries/second:
+# bursts up to SEARCH_BURST go through at full speed, and only
+# sustained load is smoothed to SEARCH_QPS — unlike the old fixed 0.5s
+# spacing, which charged every search the worst-case delay
+SEARCH_QPS = 10.0
+SEARCH_BURST = 10
+SEARCH_BATCH_SIZE = SEARCH_BURST
+
+_search_gate_lock = threading.Lock()
+_search_tokens = float(SEARCH_BURST)
+_last_refill = time.monotonic()
+
+
+def _acquire_search_slot():
+  """Block until this thread may start a search.
+
+  Takes one token from the bucket, which refills at SEARCH_QPS; when
+  the bucket runs dry the thread sleeps just long enough for the next
+  token to arrive.
+  """
+  global _search_tokens, _last_refill
+  while True:
+    with _search_gate_lock:
+      now = time.monotonic()
+      _search_tokens = min(
+        SEARCH_BURST, _search_tokens + (now - _last_refill) * SEARCH_QPS
+      )
+      _last_refill = now
+      if _search_tokens >= 1.0:
+        _search_tokens -= 1.0
+        return
+      wait = (1.0 - _search_tokens) / SEARCH_QPS
+    time.sleep(wait)
+
 
 def build_image_query(figure: dict) -> str:
   """Build a descriptive image search query for a figure."""
@@ -48,12 +105,23 @@ def build_image_query(figure: dict) -> str:
   return " ".join(query_parts)
 
 
-def update_figure_image(figure: dict, dry_run: bool = False) -> tuple[bool, str]:
+def update_figure_image(
+  figure: dict,
+  dry_run: bool = False,
+  query_cache: dict | None = None,
+  search_results: dict[str, list] | None = None,
+) -> tuple[bool, str, tuple[str, str] | None, tuple[str, str] | None]:
   """
-  Update the image for a single figure.
+  Pick the new image for a single figure, without writing to Firestore.
 
   Returns:
-      (success, message) tuple
+      (success, message, pending_update, cache_entry) tuple.
+      pending_update is (doc_id, image_url) when a write is needed;
+      cache_entry is (query_key, image_url) for the caller to persist.
+      query_cache is a read-only snapshot of previous runs' results;
+      when the cached url still matches the figure, the figure needs no
+      search at all. search_results maps image query -> validated URLs
+      from the batched search pass.
   """
   name = figure.get("name", "Unknown")
   old_image = figure.get("image_url")
@@ -62,26 +130,36 @@ def update_figure_image(figure: dict, dry_run: bool = False) -> tuple[bool, str]
   image_query = build_image_query(figure)
 
   if dry_run:
-    return True, f"[DRY RUN] Would search: '{image_query}'"
+    return True, f"[DRY RUN] Would search: '{image_query}'", None, None
+
+  cache_key = _query_cache_key(image_query)
+  if query_cache is not None and old_image:
+    cached = query_cache.get(cache_key)
+    if cached and cached.get("url") == old_image:
+      return True, "Image unchanged (cached)", None, None
 
-  # Search for new image
-  validated_images = search_images_google(image_query, num_images=IMAGES_TO_SEARCH)
+  # Figures sharing a query (same name, or the same achievement text)
+  # share one entry in search_results
+  validated_images = (search_results or {}).get(image_query) or []
 
   if not validated_images:
-    return False, "No valid images found"
+    return False, "No valid images found", None, None
 
   new_image = validated_images[0]
-
-  # Update in Firestore
   doc_id = name.replace("/", "_").replace(".", "_")
-  db.collection("historical_figures").document(doc_id).update({"image_url": new_image})
+  cache_entry = (cache_key, new_image)
 
   if old_image == new_image:
-    return True, "Image unchanged"
+    return True, "Image unchanged", None, cache_entry
   elif old_image:
-    return True, f"Updated image (was: {old_image[:50]}...)"
+    return (
+      True,
+      f"Updated image (was: {old_image[:50]}...)",
+      (doc_id, new_image),
+      cache_entry,
+    )
   else:
-    return True, "Added new image"
+    return True, "Added new image", (doc_id, new_image), cache_entry
 
 
 def main():
@@ -110,26 +188,33 @@ def main():
     action="store_true",
     help="Only update figures without images",
   )
+  parser.add_argument(
+    "--force",
+    action="store_true",
+    help="Re-run searches even when the cached result is unchanged",
+  )
   args = parser.parse_args()
 
   if not db:
     print("ERROR: Database not initialized. Check Firebase credentials.")
     sys.exit(1)
 
-  print("Fetching all figures from database...")
-  figures = get_all_figures()
-  print(f"Found {len(figures)} figures")
+  if args.missing_only:
+    # Push the filter into Firestore: on a mostly complete collection
+    # this downloads a handful of documents instead of all of them
+    print("Fetching figures without images from database...")
+    figures = get_figures_missing_image()
+    print(f"Found {len(figures)} figures without images")
+  else:
+    print("Fetching all figures from database...")
+    figures = get_all_figures()
+    print(f"Found {len(figures)} figures")
 
   # Filter by name if specified
   if args.name:
     figures = [f for f in figures if args.name.lower() in f.get("name", "").lower()]
     print(f"Filtered to {len(figures)} figures matching '{args.name}'")
 
-  # Filter to missing-only if specified
-  if args.missing_only:
-    figures = [f for f in figures if not f.get("image_url")]
-    print(f"Filtered to {len(figures)} figures without images")
-
   # Apply limit
   if args.limit:
     figures = figures[: args.limit]
@@ -145,24 +230,84 @@ def main():
   success_count = 0
   failure_count = 0
 
-  for i, figure in enumerate(figures, 1):
+  # Image searches need the rate limiting; the Firestore writes do not.
+  # Accumulate updates and commit them in batches of 500 so N figures
+  # cost ceil(N/500) write round-trips instead of one each
+  pending_updates: list[tuple[str, str]] = []
+
+  def flush_updates():
+    if not pending_updates:
+      return
+    batch = db.batch()
+    for doc_id, url in pending_updates:
+      batch.update(
+        db.collection("historical_figures").document(doc_id), {"image_url": url}
+      )
+    batch.commit()
+    print(f"\nCommitted {len(pending_updates)} image updates")
+    pending_updates.clear()
+
+  # Snapshot the query cache as a plain dict; writes happen at the end
+  # of the loop below, on this thread only
+  query_db = shelve.open(QUERY_CACHE_PATH)
+  query_cache = None if args.force else dict(query_db)
+
+  # Collect the unique queries that will actually hit the CSE: figures
+  # sharing a query (same name, or the same achievement text) search
+  # once, and cache-satisfied figures search not at all
+  unique_queries: list[str] = []
+  seen_queries: set[str] = set()
+  if not args.dry_run:
+    for figure in figures:
+      image_query = build_image_query(figure)
+      if image_query in seen_queries:
+        continue
+      old_image = figure.get("image_url")
+      if query_cache is not None and old_image:
+        cached = query_cache.get(_query_cache_key(image_query))
+        if cached and cached.get("url") == old_image:
+          continue
+      seen_queries.add(image_query)
+      unique_queries.append(image_query)
+
+  # Run the searches in batches sharing one HTTP/2 connection each; the
+  # token bucket still caps the start rate at the CSE quota
+  search_results: dict[str, list] = {}
+  if unique_queries:
+    print(f"Searching {len(unique_queries)} unique queries...")
+  for start in range(0, len(unique_queries), SEARCH_BATCH_SIZE):
+    chunk = unique_queries[start : start + SEARCH_BATCH_SIZE]
+    for _ in chunk:
+      _acquire_search_slot()
+    batch_results = search_images_google_batch(chunk, num_images=IMAGES_TO_SEARCH)
+    search_results.update(zip(chunk, batch_results))
+
+  for index, figure in enumerate(figures, 1):
     name = figure.get("name", "Unknown")
-    print(f"\n[{i}/{len(figures)}] {name}")
+    print(f"\n[{index}/{len(figures)}] {name}")
 
     try:
-      success, message = update_figure_image(figure, dry_run=args.dry_run)
+      success, message, update, cache_entry = update_figure_image(
+        figure, args.dry_run, query_cache, search_results
+      )
       print(f"  {message}")
       if success:
         success_count += 1
       else:
         failure_count += 1
+      if update:
+        pending_updates.append(update)
+        if len(pending_updates) >= FIRESTORE_BATCH_LIMIT:
+          flush_updates()
+      if cache_entry:
+        key, url = cache_entry
+        query_db[key] = {"url": url, "ts": time.time()}
     except Exception as e:
       print(f"  ERROR: {e}")
       failure_count += 1
 
-    # Rate limiting to avoid API throttling
-    if not args.dry_run and i < len(figures):
-      time.sleep(0.5)
+  flush_updates()
+  query_db.close()
 
   print()
   print("=" * 60)
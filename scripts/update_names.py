@@ -11,9 +11,15 @@ Usage:
 """
 
 import argparse
+import asyncio
+import functools
+import json
+import queue
 import re
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent dir to path for backend imports
@@ -21,90 +27,235 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import dspy
 from backend.agent import clean_name, is_valid_person_name
-from backend.database import db, get_all_figures
+from backend.database import db, iter_all_figures
 from backend.gemini import make_gemini_lm
 
 # Configuration
 MAX_WORKERS = 10
 MODEL_NAME = "gemini-2.5-flash-lite"
-
-
-class ExtractPersonNameFromProfile(dspy.Signature):
-  """Extract the historical figure's full name from their profile information.
-
-  You are given profile information about a historical figure. The 'name' field
-  may be malformed (containing markdown, descriptions, or garbage text).
-  Use the OTHER fields (achievement, marginalization_context, challenges_faced,
-  how_they_overcame) to determine the person's actual name.
+# The yes/no validator is a trivial classification, so it runs on the
+# cheapest/fastest tier rather than the extraction model
+VALIDATOR_MODEL_NAME = "gemini-2.0-flash-lite"
+
+# Firestore allows up to 500 operations per batch commit
+FIRESTORE_BATCH_LIMIT = 500
+
+# Figures per batched extraction call: one Gemini round-trip fixes up to
+# this many names at once instead of one call per figure
+BATCH_FIX_SIZE = 200
+
+# Patterns compiled once at import: these checks run per figure across the
+# whole collection, and one alternation scan replaces a Python loop over
+# individual patterns
+
+# Topic/concept openers that indicate the "name" is not a person
+_TOPIC_RE = re.compile(
+  r"^(?:financial|digital|technology|social|political|economic|security|privacy)",
+  re.IGNORECASE,
+)
+
+# Common failure patterns from LLM output / clean_name artifacts
+_FAILURE_RE = re.compile(
+  "|".join(
+    f"(?:{p})"
+    for p in (
+      r"^not\s+(specified|mentioned|provided)",
+      r"^this\s+",
+      r"^no\s+(person|name|valid)",
+      r"^empty",
+      r"^n/a$",
+      r"^none$",
+      r"^unknown$",
+      r"^the\s+",
+      r"^a\s+",
+      r"^an\s+",
+      r"###",
+      r"\*\*",
+      # Common non-name patterns from clean_name output
+      r"^demographic\s+fit",
+      r"^field\s*&?\s*contributions?",
+      r"^hacking\s+the",
+      r"^why\s+i\s+am",
+      r"^misgendering\s+machines",
+    )
+  ),
+  re.IGNORECASE,
+)
+
+# One scan covering every suspicious substring the malformed checks look
+# for (markdown asterisks, dash separators); clean names take a single
+# regex pass instead of four substring probes
+_SUSPECT_RE = re.compile(r"[*–]| - ")
+
+# Honorifics stripped from the front of names; longest variants first
+_TITLE_RE = re.compile(
+  r"^(?:Professor|Prof\.?|Dr\.?|Mrs\.?|Mr\.?|Ms\.?|Sir|Dame|Reverend|Rev\.?)\s+",
+  re.IGNORECASE,
+)
+
+
+class BatchFixNames(dspy.Signature):
+  """Extract each historical figure's full name from their profile information.
+
+  You are given a JSON array of figure profiles. Each profile has an 'id' and
+  a 'name' field that may be malformed (containing markdown, descriptions, or
+  garbage text). Use the OTHER fields (achievement, marginalization_context,
+  challenges_faced, how_they_overcame) to determine each person's actual name.
 
   RULES:
-  1. Return ONLY the person's full name (e.g., "Marie Curie", "Malcolm X")
+  1. Return a JSON object mapping every id to the person's full name
+     (e.g., {"0": "Marie Curie", "1": "Malcolm X"})
   2. Do NOT include titles like Dr., Prof., etc.
   3. Do NOT include markdown formatting like ** or *
   4. Do NOT include descriptions or explanations
-  5. If you cannot determine a valid person name, return exactly: UNKNOWN
+  5. If you cannot determine a valid person name for an id, map it to null
+  6. Every input id must appear exactly once in the output
 
-  Examples of GOOD outputs: "Anna Lauren Hoffmann", "Chelsea Manning", "Tortuguita"
-  Examples of BAD outputs: "**Anna Hoffmann**", "Dr. Chelsea Manning", "A professor at Georgia Tech"
+  Examples of GOOD name values: "Anna Lauren Hoffmann", "Chelsea Manning", "Tortuguita"
+  Examples of BAD name values: "**Anna Hoffmann**", "Dr. Chelsea Manning", "A professor at Georgia Tech"
   """
 
-  name_field = dspy.InputField(desc="The potentially malformed name field")
-  achievement = dspy.InputField(desc="What this person achieved")
-  marginalization_context = dspy.InputField(desc="Context about their marginalization")
-  challenges_faced = dspy.InputField(desc="Challenges they faced (may be empty)")
-  how_they_overcame = dspy.InputField(
-    desc="How they overcame challenges (may be empty)"
+  figures_json = dspy.InputField(
+    desc="JSON array of figure profiles, each with an 'id' and a potentially malformed 'name'"
   )
-
-  person_name = dspy.OutputField(
-    desc="The person's full name only (e.g., 'Marie Curie'), or 'UNKNOWN' if cannot determine"
+  names_json = dspy.OutputField(
+    desc='JSON object mapping each id to the full name string, or null (e.g., {"0": "Marie Curie", "1": null})'
   )
 
 
-class IsPersonName(dspy.Signature):
-  """Determine if text is a person's name (not a topic, description, or concept).
+class BatchIsPersonName(dspy.Signature):
+  """Determine, for each numbered line, if it is a person's name.
 
-  You are given text that may or may not be a person's name. Determine if this
-  is actually a real person's name vs. a topic, concept, organization, or description.
+  You are given numbered candidate strings, one per line. For each one,
+  determine if it is actually a real person's name vs. a topic, concept,
+  organization, or description.
 
   RULES:
-  1. Answer 'yes' ONLY if this is clearly a person's full or partial name
-  2. Answer 'no' if this is a topic (e.g., "Financial Technology and Inclusion")
-  3. Answer 'no' if this is a description (e.g., "A pioneer in civil rights")
-  4. Answer 'no' if this is an organization or concept
+  1. Answer 'yes' ONLY if the line is clearly a person's full or partial name
+  2. Answer 'no' if it is a topic (e.g., "Financial Technology and Inclusion")
+  3. Answer 'no' if it is a description (e.g., "A pioneer in civil rights")
+  4. Answer 'no' if it is an organization or concept
   5. Single words that could be names (e.g., "Malcolm", "Rosa") should be 'yes'
+  6. Output exactly one answer line per input line, keeping the numbering
+
+  Example input:
+  1. Marie Curie
+  2. Financial Technology and Inclusion
+  3. Harriet
 
-  Examples:
-  - "Marie Curie" -> yes
-  - "Financial Technology and Inclusion" -> no
-  - "Dr. Martin Luther King Jr." -> yes
-  - "Civil Rights Movement" -> no
-  - "Harriet" -> yes
-  - "Indigenous Environmental Activism" -> no
+  Example output:
+  1: yes
+  2: no
+  3: yes
   """
 
-  text = dspy.InputField(desc="Text to evaluate")
-  is_person_name = dspy.OutputField(
-    desc="Answer 'yes' if this is a real person's name, 'no' if it's a topic, description, or not a name"
+  texts = dspy.InputField(desc="Numbered candidate strings, one per line")
+  answers = dspy.OutputField(
+    desc="One line per candidate, '<number>: yes' or '<number>: no', in input order"
   )
 
 
-# Global LM instance for LLM validation (set in main())
-_global_lm = None
+# Predictors are stateless at inference time, so build them once at import
+# and share them across threads instead of re-resolving the signature and
+# prompt template on every call
+_BATCH_FIX_PREDICT = dspy.Predict(BatchFixNames)
+_VALIDATE_PREDICT = dspy.Predict(BatchIsPersonName)
 
 
-def llm_validate_name(name: str) -> bool:
-  """Use LLM to verify a name is actually a person's name."""
-  if _global_lm is None:
-    return True  # Fail open if LM not initialized
+@functools.lru_cache(maxsize=1)
+def get_lm():
+  """Build the shared Gemini LM once per process.
+
+  Every caller (main, the validator running inside worker threads) gets
+  the same instance instead of threading it through a mutable global.
+  """
+  return make_gemini_lm(model_name=MODEL_NAME)
+
+
+@functools.lru_cache(maxsize=1)
+def get_validator_lm():
+  """Build the (cheaper) LM used for yes/no name validation."""
+  return make_gemini_lm(model_name=VALIDATOR_MODEL_NAME)
+
+
+# Micro-batching for LLM validation: worker threads enqueue names and a
+# dedicated batcher thread flushes every 20 names or 200ms, so up to 20
+# validations share one Gemini round-trip instead of one call each
+_VALIDATION_BATCH_SIZE = 20
+_VALIDATION_BATCH_WAIT_SECONDS = 0.2
+_VALIDATION_TIMEOUT_SECONDS = 120
+
+_ANSWER_LINE_RE = re.compile(r"^(\d+)\s*[:.)]\s*(yes|no)", re.IGNORECASE)
+
+_validation_queue: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+_batcher_lock = threading.Lock()
+_batcher_started = False
+
+
+def _parse_batch_answers(answers: str, count: int) -> list[bool]:
+  """Parse '<number>: yes/no' lines; unparsed entries fail open to True."""
+  verdicts = [True] * count
+  for line in answers.splitlines():
+    match = _ANSWER_LINE_RE.match(line.strip())
+    if match:
+      idx = int(match.group(1)) - 1
+      if 0 <= idx < count:
+        verdicts[idx] = match.group(2).lower() == "yes"
+  return verdicts
+
+
+def _run_validation_batch(batch: list[tuple[str, Future]]) -> None:
+  """Classify one batch of names with a single Gemini call."""
+  names = [name for name, _ in batch]
+  try:
+    lm = get_validator_lm()
+    with dspy.context(lm=lm):
+      result = _VALIDATE_PREDICT(
+        texts="\n".join(f"{i}. {name}" for i, name in enumerate(names, 1))
+      )
+    verdicts = _parse_batch_answers(result.answers, len(names))
+  except Exception:
+    verdicts = [True] * len(names)  # Fail open - don't reject on error
+
+  for (_, future), verdict in zip(batch, verdicts):
+    future.set_result(verdict)
 
-  validator = dspy.Predict(IsPersonName)
 
+def _validation_batcher() -> None:
+  """Drain the validation queue, dispatching one LM call per batch."""
+  while True:
+    batch = [_validation_queue.get()]
+    deadline = time.monotonic() + _VALIDATION_BATCH_WAIT_SECONDS
+    while len(batch) < _VALIDATION_BATCH_SIZE:
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        break
+      try:
+        batch.append(_validation_queue.get(timeout=remaining))
+      except queue.Empty:
+        break
+    _run_validation_batch(batch)
+
+
+def _ensure_batcher() -> None:
+  global _batcher_started
+  with _batcher_lock:
+    if not _batcher_started:
+      threading.Thread(target=_validation_batcher, daemon=True).start()
+      _batcher_started = True
+
+
+def llm_validate_name(name: str) -> bool:
+  """Use LLM to verify a name is actually a person's name.
+
+  Enqueues the name and blocks on a Future; the batcher thread folds
+  concurrent requests into shared Gemini calls transparently.
+  """
+  _ensure_batcher()
+  future: Future = Future()
+  _validation_queue.put((name, future))
   try:
-    with dspy.context(lm=_global_lm):
-      result = validator(text=name)
-      answer = result.is_person_name.strip().lower()
-      return answer.startswith("yes")
+    return future.result(timeout=_VALIDATION_TIMEOUT_SECONDS)
   except Exception:
     return True  # Fail open - don't reject on error
 
@@ -119,33 +270,25 @@ def detect_malformed_name(name: str) -> tuple[bool, str]:
   if not name:
     return True, "empty"
 
-  # Check for markdown
-  if "**" in name or "*" in name:
-    return True, "has_markdown"
+  # Cheap pretest: the overwhelmingly common clean case (short, no
+  # markdown, no separators) passes one length compare and one scan,
+  # and only suspicious names take the precise checks inside
+  if len(name) > 50 or _SUSPECT_RE.search(name):
+    # Check for markdown
+    if "**" in name or "*" in name:
+      return True, "has_markdown"
 
-  # Check for description separators
-  if " – " in name or (" - " in name and len(name) > 50):
-    return True, "has_description"
+    # Check for description separators
+    if " – " in name or (" - " in name and len(name) > 50):
+      return True, "has_description"
 
-  # Check for names that are too long (likely descriptions)
-  if len(name) > 50:
-    return True, "too_long"
+    # Check for names that are too long (likely descriptions)
+    if len(name) > 50:
+      return True, "too_long"
 
   # Check for topic/concept words that indicate this isn't a person name
-  topic_starters = [
-    "financial",
-    "digital",
-    "technology",
-    "social",
-    "political",
-    "economic",
-    "security",
-    "privacy",
-  ]
-  name_lower = name.lower()
-  for word in topic_starters:
-    if name_lower.startswith(word):
-      return True, "topic_word"
+  if _TOPIC_RE.match(name):
+    return True, "topic_word"
 
   # Check with validation function
   cleaned = clean_name(name)
@@ -174,29 +317,8 @@ def is_plausible_person_name(name: str) -> bool:
     return False
 
   # Reject common failure patterns (case-insensitive)
-  failure_patterns = [
-    r"^not\s+(specified|mentioned|provided)",
-    r"^this\s+",
-    r"^no\s+(person|name|valid)",
-    r"^empty",
-    r"^n/a$",
-    r"^none$",
-    r"^unknown$",
-    r"^the\s+",
-    r"^a\s+",
-    r"^an\s+",
-    r"###",
-    r"\*\*",
-    # Common non-name patterns from clean_name output
-    r"^demographic\s+fit",
-    r"^field\s*&?\s*contributions?",
-    r"^hacking\s+the",
-    r"^why\s+i\s+am",
-    r"^misgendering\s+machines",
-  ]
-  for pattern in failure_patterns:
-    if re.search(pattern, name, re.IGNORECASE):
-      return False
+  if _FAILURE_RE.search(name):
+    return False
 
   # Must start with capital (but allow known lowercase names)
   known_lowercase_names = ["maia arson crimew"]
@@ -218,121 +340,179 @@ def is_plausible_person_name(name: str) -> bool:
 
 def strip_titles(name: str) -> str:
   """Remove common titles from the beginning of a name."""
-  title_patterns = [
-    r"^Dr\.?\s+",
-    r"^Prof\.?\s+",
-    r"^Professor\s+",
-    r"^Mr\.?\s+",
-    r"^Mrs\.?\s+",
-    r"^Ms\.?\s+",
-    r"^Sir\s+",
-    r"^Dame\s+",
-    r"^Rev\.?\s+",
-    r"^Reverend\s+",
-  ]
+  # Repeat so stacked titles ("Dr. Prof. X") still strip fully, as the
+  # old sequential per-pattern subs did
   result = name
-  for pattern in title_patterns:
-    result = re.sub(pattern, "", result, flags=re.IGNORECASE)
-  return result.strip()
+  while True:
+    stripped = _TITLE_RE.sub("", result, count=1)
+    if stripped == result:
+      return result.strip()
+    result = stripped
+
 
+def _strip_code_fence(text: str) -> str:
+  """Drop a surrounding ```json fence if the model emitted one."""
+  text = text.strip()
+  if text.startswith("```"):
+    text = text.split("\n", 1)[1] if "\n" in text else ""
+    text = text.rstrip()
+    if text.endswith("```"):
+      text = text[:-3]
+  return text.strip()
 
-def extract_name_with_llm(figure: dict, lm) -> str | None:
+
+def extract_names_with_llm_batch(figures: list[dict], lm) -> dict[int, str | None]:
   """
-  Use Gemini to extract a person's name using ALL available profile context.
+  Use Gemini to extract person names for a whole chunk of figures in one call.
+
+  Returns a mapping from each figure's position in `figures` to the raw
+  extracted name (None when the model could not determine one). An empty
+  mapping means the call or its JSON parse failed.
   """
-  extractor = dspy.Predict(ExtractPersonNameFromProfile)
+  payload = [
+    {
+      "id": i,
+      "name": fig.get("name", ""),
+      "achievement": fig.get("achievement", ""),
+      "marginalization_context": fig.get("marginalization_context", ""),
+      "challenges_faced": fig.get("challenges_faced", "") or "",
+      "how_they_overcame": fig.get("how_they_overcame", "") or "",
+    }
+    for i, fig in enumerate(figures)
+  ]
 
   try:
     with dspy.context(lm=lm):
-      result = extractor(
-        name_field=figure.get("name", ""),
-        achievement=figure.get("achievement", ""),
-        marginalization_context=figure.get("marginalization_context", ""),
-        challenges_faced=figure.get("challenges_faced", "") or "",
-        how_they_overcame=figure.get("how_they_overcame", "") or "",
-      )
-      name = result.person_name.strip()
-
-      if not name or name.upper() == "UNKNOWN":
-        return None
-
-      # Clean, strip titles, and validate
-      name = clean_name(name)
-      name = strip_titles(name)
-      if not name or not is_valid_person_name(name):
-        return None
+      result = _BATCH_FIX_PREDICT(figures_json=json.dumps(payload))
+    raw = json.loads(_strip_code_fence(result.names_json))
+  except Exception as e:
+    print(f"  [ERROR] Batch LLM extraction failed: {e}")
+    return {}
+
+  if not isinstance(raw, dict):
+    print("  [ERROR] Batch LLM extraction returned non-object JSON")
+    return {}
+
+  extracted: dict[int, str | None] = {}
+  for key, value in raw.items():
+    try:
+      idx = int(key)
+    except (TypeError, ValueError):
+      continue
+    if 0 <= idx < len(figures):
+      extracted[idx] = value.strip() if isinstance(value, str) else None
+  return extracted
+
+
+def finalize_extracted_name(name: str | None) -> str | None:
+  """Clean, strip titles, and validate a batch-extracted name."""
+  if not name or name.upper() == "UNKNOWN":
+    return None
 
-      if not is_plausible_person_name(name):
-        return None
+  name = clean_name(name)
+  name = strip_titles(name)
+  if not name or not is_valid_person_name(name):
+    return None
 
-      return name
-  except Exception as e:
-    print(f"  [ERROR] LLM extraction failed: {e}")
+  if not is_plausible_person_name(name):
     return None
 
+  return name
 
-def process_figure(figure: dict, lm, dry_run: bool) -> dict | None:
-  """
-  Process a single figure, fixing its name if malformed.
 
-  Returns:
-      Dict with update info if changed, None otherwise
-  """
+def build_result(
+  figure: dict, reason: str, new_name: str | None, method: str, dry_run: bool
+) -> dict:
+  """Build the fix record for one figure given its resolved name."""
   name = figure.get("name", "")
   doc_id = name.replace("/", "_").replace(".", "_")
 
-  is_malformed, reason = detect_malformed_name(name)
-
-  if not is_malformed:
-    return None
-
-  # First try simple cleaning for obvious cases like "**John Smith**"
-  cleaned = clean_name(name)
-  if (
-    cleaned
-    and is_valid_person_name(cleaned)
-    and cleaned != name
-    and is_plausible_person_name(cleaned)
-  ):
-    new_name = cleaned
-    method = "clean_name"
-  else:
-    # Use LLM with full profile context
-    new_name = extract_name_with_llm(figure, lm)
-    method = "llm_extract"
-
   if not new_name:
-    # Delete entries that can't be fixed (not valid person names)
-    if not dry_run and db:
-      db.collection("historical_figures").document(doc_id).delete()
+    # Entries that can't be fixed (not valid person names) get deleted
+    # by the batched writer in main
     return {
       "old_name": name,
       "new_name": None,
       "reason": reason,
       "method": "deleted",
       "applied": not dry_run,
+      "doc_id": doc_id,
     }
 
-  # Apply update if not dry run
-  if not dry_run and db:
-    new_doc_id = new_name.replace("/", "_").replace(".", "_")
-
-    if doc_id != new_doc_id:
-      # Name change requires document rename (copy + delete)
-      figure["name"] = new_name
-      db.collection("historical_figures").document(new_doc_id).set(figure)
-      db.collection("historical_figures").document(doc_id).delete()
-    else:
-      # Just update the name field
-      db.collection("historical_figures").document(doc_id).update({"name": new_name})
-
-  return {
+  new_doc_id = new_name.replace("/", "_").replace(".", "_")
+  result = {
     "old_name": name,
     "new_name": new_name,
     "reason": reason,
     "method": method,
     "applied": not dry_run,
+    "doc_id": doc_id,
+    "new_doc_id": new_doc_id,
   }
+  if doc_id != new_doc_id:
+    # Name change requires a document rename; carry the full figure so
+    # the writer can set the new doc and delete the old one together
+    result["figure"] = {**figure, "name": new_name}
+  return result
+
+
+def try_clean_fix(figure: dict, reason: str, dry_run: bool) -> dict | None:
+  """
+  Try the simple non-LLM fix for obvious cases like "**John Smith**".
+
+  Returns:
+      Fix record if clean_name alone resolves the figure, None if it
+      needs the batched LLM extraction
+  """
+  name = figure.get("name", "")
+  cleaned = clean_name(name)
+  if (
+    cleaned
+    and is_valid_person_name(cleaned)
+    and cleaned != name
+    and is_plausible_person_name(cleaned)
+  ):
+    return build_result(figure, reason, cleaned, "clean_name", dry_run)
+  return None
+
+
+def apply_results(results: list[dict]) -> None:
+  """Commit all fixes in Firestore WriteBatches.
+
+  A rename's set+delete lands in the same batch commit (2 of the 500
+  operation slots), so a crash can no longer leave a half-renamed
+  document, and N fixes cost a few commits instead of 1-2 round-trips
+  each.
+  """
+  collection = db.collection("historical_figures")
+  batch = db.batch()
+  slots = 0
+  commits = 0
+
+  for r in results:
+    is_rename = r["new_name"] and r["doc_id"] != r.get("new_doc_id")
+    needed = 2 if is_rename else 1
+
+    if slots + needed > FIRESTORE_BATCH_LIMIT:
+      batch.commit()
+      commits += 1
+      batch = db.batch()
+      slots = 0
+
+    if r["method"] == "deleted":
+      batch.delete(collection.document(r["doc_id"]))
+    elif is_rename:
+      batch.set(collection.document(r["new_doc_id"]), r["figure"])
+      batch.delete(collection.document(r["doc_id"]))
+    else:
+      batch.update(collection.document(r["doc_id"]), {"name": r["new_name"]})
+    slots += needed
+
+  if slots:
+    batch.commit()
+    commits += 1
+
+  print(f"Committed {len(results)} fixes in {commits} batch commits")
 
 
 def main():
@@ -356,24 +536,34 @@ def main():
   print(f"Mode: {'DRY RUN (preview only)' if dry_run else 'APPLY CHANGES'}")
   print()
 
-  # Initialize LM and set global for LLM validation
-  global _global_lm
+  # Warm the Firestore gRPC channel while the LM initializes, so the
+  # first real query below doesn't also pay cold-channel setup
+  warmup = None
+  if db:
+    warmup = threading.Thread(
+      target=lambda: db.collection("historical_figures").limit(1).get(),
+      daemon=True,
+    )
+    warmup.start()
+
   print(f"Initializing {MODEL_NAME}...")
-  lm = make_gemini_lm(model_name=MODEL_NAME)
-  _global_lm = lm
+  lm = get_lm()
 
-  # Fetch all figures
-  print("Fetching all figures from database...")
-  figures = get_all_figures()
-  print(f"Found {len(figures)} figures")
+  if warmup:
+    warmup.join()
 
-  # Identify malformed names
+  # Stream figures and identify malformed names as documents arrive;
+  # only the (usually small) malformed subset is kept in memory
+  print("Scanning figures from database...")
   malformed = []
-  for fig in figures:
+  total = 0
+  for fig in iter_all_figures():
+    total += 1
     name = fig.get("name", "")
     is_bad, reason = detect_malformed_name(name)
     if is_bad:
       malformed.append((fig, reason))
+  print(f"Scanned {total} figures")
 
   print(f"Found {len(malformed)} malformed names:")
   for fig, reason in malformed[:10]:
@@ -391,19 +581,65 @@ def main():
     malformed = malformed[: args.limit]
     print(f"Limited to {args.limit} figures")
 
-  # Process in parallel
+  # Process concurrently under one event loop. The DSPy predictors are
+  # synchronous, so each step still runs in a thread, but the semaphore
+  # (not a fixed pool) sets the concurrency ceiling — raising --workers
+  # scales in-flight Gemini calls without re-plumbing, and more overlap
+  # means fuller validation batches
   print(f"Processing {len(malformed)} figures with {args.workers} workers...")
-  results = []
 
-  with ThreadPoolExecutor(max_workers=args.workers) as executor:
-    futures = {
-      executor.submit(process_figure, fig, lm, dry_run): fig for fig, _ in malformed
-    }
+  async def _process_all():
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=args.workers))
+    sem = asyncio.Semaphore(args.workers)
+
+    async def in_thread(fn, *fn_args):
+      async with sem:
+        return await asyncio.to_thread(fn, *fn_args)
+
+    # Phase 1: the cheap clean_name fix, tried for every figure
+    outcomes = await asyncio.gather(
+      *(in_thread(try_clean_fix, fig, reason, dry_run) for fig, reason in malformed)
+    )
+    results = [r for r in outcomes if r]
+    unresolved = [item for item, r in zip(malformed, outcomes) if not r]
+
+    # Phase 2: everything clean_name couldn't fix goes to Gemini in
+    # chunks, one extraction call per BATCH_FIX_SIZE figures
+    chunks = [
+      unresolved[i : i + BATCH_FIX_SIZE]
+      for i in range(0, len(unresolved), BATCH_FIX_SIZE)
+    ]
+    if chunks:
+      print(
+        f"Extracting {len(unresolved)} names with {len(chunks)} batched LLM call(s)..."
+      )
+    extracted_maps = await asyncio.gather(
+      *(
+        in_thread(extract_names_with_llm_batch, [f for f, _ in chunk], lm)
+        for chunk in chunks
+      )
+    )
+
+    # Phase 3: validate the extracted names (the plausibility check may
+    # hit the batched validator, so this also runs concurrently)
+    finalize_tasks = []
+    for chunk, extracted in zip(chunks, extracted_maps):
+      for i, (fig, reason) in enumerate(chunk):
+
+        def finalize(fig=fig, reason=reason, raw=extracted.get(i)):
+          return build_result(
+            fig, reason, finalize_extracted_name(raw), "llm_extract", dry_run
+          )
+
+        finalize_tasks.append(in_thread(finalize))
+    results.extend(await asyncio.gather(*finalize_tasks))
+    return results
+
+  results = asyncio.run(_process_all())
 
-    for future in as_completed(futures):
-      result = future.result()
-      if result:
-        results.append(result)
+  if not dry_run and db and results:
+    apply_results(results)
 
   # Report
   print()
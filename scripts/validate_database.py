@@ -28,27 +28,90 @@ Usage:
 """
 
 import argparse
+import asyncio
+import hashlib
+import logging
 import os
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Tuple
+import queue
+import shelve
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from dotenv import load_dotenv
 
-from backend.database import get_all_figures, save_figure
-from backend.tools import search_images_google, validate_image_url
+from backend.database import db, get_figure_by_name, iter_all_figures, save_figure
+from backend.tools import (
+  clear_search_cache,
+  search_images_google,
+  validate_image_url,
+  validate_images_parallel,
+)
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Thread-safe printing
-print_lock = threading.Lock()
+# On-disk cache of URLs that passed validation in previous runs: image
+# links rot slowly, so within the TTL a repeat run skips the HEAD request
+# entirely instead of re-checking thousands of unchanged URLs
+VALIDITY_CACHE_PATH = str(Path(__file__).parent / ".image_validity_cache")
+VALIDITY_CACHE_TTL_SECONDS = 7 * 86400
 
+# Firestore allows up to 500 operations per batch commit
+FIRESTORE_BATCH_LIMIT = 500
 
-def thread_safe_print(*args, **kwargs):
-  """Thread-safe print function."""
-  with print_lock:
-    print(*args, **kwargs)
+
+def _validity_cache_key(url: str) -> str:
+  return hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+
+# Worker log lines funnel through a queue drained by one listener thread:
+# enqueueing is lock-free for the workers, and only the listener touches
+# stdout, so logging no longer serializes the pool the way a shared print
+# lock did
+_log_queue: "queue.Queue" = queue.Queue()
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+
+_logger = logging.getLogger(__name__)
+_logger.setLevel(logging.INFO)
+_logger.addHandler(QueueHandler(_log_queue))
+_logger.propagate = False
+
+
+def thread_safe_print(*args):
+  """Queue a log line; the listener thread owns the actual stdout write."""
+  _logger.info(" ".join(str(arg) for arg in args))
+
+
+# Field lists hoisted to module scope: check_required_fields runs once per
+# figure across the whole collection, so the hot loop should only index
+# these tuples rather than rebuild them
+_REQUIRED_TEXT_FIELDS = (
+  "name",
+  "marginalization_context",
+  "challenges_faced",
+  "how_they_overcame",
+  "achievement",
+)
+_DEMOGRAPHIC_FIELDS = ("race", "ethnicity", "cultural_background")
+
+# Fetches all five text fields in one C-level call; figures missing a key
+# (rare) fall back to per-field .get below
+_GET_TEXT_FIELDS = itemgetter(*_REQUIRED_TEXT_FIELDS)
+
+
+def _has_demographic_value(value: Any) -> bool:
+  """True for a non-empty list or non-blank string demographic entry."""
+  if isinstance(value, list):
+    return len(value) > 0
+  if isinstance(value, str):
+    return bool(value.strip())
+  return False
 
 
 def check_required_fields(figure: Dict[str, Any]) -> Tuple[bool, List[str]]:
@@ -69,47 +132,34 @@ def check_required_fields(figure: Dict[str, Any]) -> Tuple[bool, List[str]]:
   Returns:
       (is_valid, missing_fields) tuple
   """
-  missing = []
-
-  # Check basic text fields
-  required_text_fields = [
-    "name",
-    "marginalization_context",
-    "challenges_faced",
-    "how_they_overcame",
-    "achievement",
+  # Check basic text fields in one pass
+  try:
+    values = _GET_TEXT_FIELDS(figure)
+  except KeyError:
+    values = tuple(figure.get(field) for field in _REQUIRED_TEXT_FIELDS)
+  missing = [
+    field
+    for field, value in zip(_REQUIRED_TEXT_FIELDS, values)
+    if not value or (isinstance(value, str) and not value.strip())
   ]
 
-  for field in required_text_fields:
-    value = figure.get(field)
-    if not value or (isinstance(value, str) and not value.strip()):
-      missing.append(field)
-
-  # Check tags/demographics
+  # Check tags/demographics: need at least one demographic field
   tags = figure.get("tags", {})
   if not tags or not isinstance(tags, dict):
     missing.append("tags")
-  else:
-    # Need at least one demographic field
-    has_demographics = False
-    for demo_field in ["race", "ethnicity", "cultural_background"]:
-      demo_value = tags.get(demo_field)
-      if demo_value:
-        if isinstance(demo_value, list) and len(demo_value) > 0:
-          has_demographics = True
-          break
-        elif isinstance(demo_value, str) and demo_value.strip():
-          has_demographics = True
-          break
-
-    if not has_demographics:
-      missing.append("demographics (race/ethnicity/cultural_background)")
+  elif not any(
+    _has_demographic_value(tags.get(field)) for field in _DEMOGRAPHIC_FIELDS
+  ):
+    missing.append("demographics (race/ethnicity/cultural_background)")
 
   return len(missing) == 0, missing
 
 
 def validate_figure(
-  figure: Dict[str, Any], verbose: bool = False
+  figure: Dict[str, Any],
+  verbose: bool = False,
+  known_valid: Optional[Set[str]] = None,
+  fix_mode: bool = False,
 ) -> Tuple[bool, Dict[str, Any]]:
   """
   Validate a single figure for completeness and image validity.
@@ -117,15 +167,27 @@ def validate_figure(
   Args:
       figure: Figure dictionary from database
       verbose: Print detailed info
+      known_valid: URLs that passed validation within the cache TTL; these
+          skip the HTTP check entirely
+      fix_mode: True when the caller will try to fix broken images, which
+          makes the image check worth running even for incomplete figures
 
   Returns:
       (is_valid, issues) tuple where issues contains:
         - missing_fields: list of missing required fields
-        - image_status: "valid", "invalid", "missing", or None
+        - image_status: "valid", "invalid", "missing", "skipped", or None
         - image_url: the image URL (if present)
+        - image_cached: True when "valid" came from the validity cache
+          rather than an HTTP check this run
   """
   name = figure.get("name", "Unknown")
-  issues = {"name": name, "missing_fields": [], "image_status": None, "image_url": None}
+  issues = {
+    "name": name,
+    "missing_fields": [],
+    "image_status": None,
+    "image_url": None,
+    "image_cached": False,
+  }
 
   # Check required fields
   is_complete, missing_fields = check_required_fields(figure)
@@ -135,6 +197,17 @@ def validate_figure(
   image_url = figure.get("image_url")
   if not image_url:
     issues["image_status"] = "missing"
+  elif not is_complete and not fix_mode:
+    # Missing text fields already make the figure invalid and no fix will
+    # run, so the HTTP round-trip cannot change the outcome
+    issues["image_url"] = image_url
+    issues["image_status"] = "skipped"
+  elif known_valid and image_url in known_valid:
+    issues["image_url"] = image_url
+    issues["image_status"] = "valid"
+    issues["image_cached"] = True
+    if verbose:
+      thread_safe_print("    ✓ Image URL valid in a previous run (cached)")
   else:
     issues["image_url"] = image_url
     if verbose:
@@ -188,25 +261,23 @@ def fix_broken_image(figure: Dict[str, Any], verbose: bool = False) -> Tuple[boo
     if verbose:
       thread_safe_print(f"    Found {len(candidate_images)} candidate images, validating each...")
 
-    # Try each candidate until we find one that works
-    for i, candidate_url in enumerate(candidate_images, 1):
-      if verbose:
-        thread_safe_print(f"    Trying candidate {i}/{len(candidate_images)}: {candidate_url[:60]}...")
-
-      # Double-check validation (images can become invalid quickly)
-      if validate_image_url(candidate_url):
-        # This one works! Use it.
-        figure["image_url"] = candidate_url
+    # Double-check all candidates concurrently (images can become invalid
+    # quickly) and keep the lowest-index one that passes: worst-case fix
+    # latency drops from 10 sequential HEADs to one concurrent round
+    valid_urls = validate_images_parallel(
+      candidate_images, num_valid_needed=len(candidate_images)
+    )
 
-        # Save updated figure
-        save_figure(figure, generate_embeddings=False)  # Don't regenerate embeddings
+    if valid_urls:
+      candidate_url = valid_urls[0]
+      i = candidate_images.index(candidate_url) + 1
+      # Only mutate the figure here; the caller stages the Firestore write
+      # so fixes commit in batches rather than one RPC each
+      figure["image_url"] = candidate_url
 
-        if verbose:
-          thread_safe_print(f"    ✓ Fixed with candidate {i}: {candidate_url[:80]}...")
-        return True, f"Fixed successfully with candidate {i}/{len(candidate_images)}"
-      else:
-        if verbose:
-          thread_safe_print(f"      ✗ Candidate {i} failed validation")
+      if verbose:
+        thread_safe_print(f"    ✓ Fixed with candidate {i}: {candidate_url[:80]}...")
+      return True, f"Fixed successfully with candidate {i}/{len(candidate_images)}"
 
     # None of the candidates worked
     reason = f"All {len(candidate_images)} candidate images failed validation"
@@ -222,31 +293,48 @@ def fix_broken_image(figure: Dict[str, Any], verbose: bool = False) -> Tuple[boo
 
 
 def process_figure(
-  figure: Dict[str, Any], index: int, total: int, args, show_index: bool = True
+  figure: Dict[str, Any],
+  index: int,
+  total: Optional[int],
+  args,
+  show_index: bool = True,
+  known_valid: Optional[Set[str]] = None,
 ) -> Dict[str, Any]:
   """
   Process a single figure: validate and optionally fix.
   Returns a result dictionary with validation status and fix results.
+
+  total is None when figures are streamed and the count isn't known yet.
   """
   name = figure.get("name", "Unknown")
 
   # Show progress
   if show_index:
-    thread_safe_print(f"{index}/{total}. {name}")
+    progress = f"{index}/{total}" if total else str(index)
+    thread_safe_print(f"{progress}. {name}")
   else:
     thread_safe_print(f"Checking: {name}")
 
   # Validate
-  is_valid, issues = validate_figure(figure, verbose=args.verbose)
+  is_valid, issues = validate_figure(
+    figure, verbose=args.verbose, known_valid=known_valid, fix_mode=args.fix
+  )
 
   result = {
     "name": name,
     "is_valid": is_valid,
     "issues": issues,
     "fixed": False,
+    "fixed_figure": None,
     "fix_failed": False,
     "fix_failure_reason": None,
     "original_image_url": issues.get("image_url"),
+    # URL the validity cache should remember; written by the main thread.
+    # Cache hits are excluded: re-stamping them on every run would keep a
+    # URL "valid" forever without it ever being re-checked over HTTP.
+    "validated_url": issues["image_url"]
+    if issues["image_status"] == "valid" and not issues["image_cached"]
+    else None,
   }
 
   if is_valid:
@@ -264,6 +352,8 @@ def process_figure(
       thread_safe_print(f"    Image: Invalid/Broken URL")
       if issues["image_url"]:
         thread_safe_print(f"      URL: {issues['image_url'][:80]}...")
+    elif issues["image_status"] == "skipped":
+      thread_safe_print(f"    Image: Not checked (figure invalid on text fields)")
 
     # Fix image immediately if requested and image is the problem
     if args.fix and issues["image_status"] in ["invalid", "missing"]:
@@ -271,6 +361,8 @@ def process_figure(
       success, reason = fix_broken_image(figure, verbose=args.verbose)
       if success:
         result["fixed"] = True
+        result["validated_url"] = figure.get("image_url")
+        result["fixed_figure"] = figure
         thread_safe_print(f"    ✅ Image fixed!")
       else:
         result["fix_failed"] = True
@@ -305,8 +397,21 @@ def main():
     default=10,
     help="Number of parallel workers for validation (default: 10)",
   )
+  parser.add_argument(
+    "--force-revalidate",
+    action="store_true",
+    help="Ignore the on-disk validity cache and re-check every image URL",
+  )
+  parser.add_argument(
+    "--ignore-cse-cache",
+    action="store_true",
+    help="Drop cached Google image search results before running",
+  )
   args = parser.parse_args()
 
+  if args.ignore_cse_cache:
+    clear_search_cache()
+
   print("=" * 60)
   print("Kindred Histories - Database Validation")
   print("=" * 60)
@@ -318,25 +423,20 @@ def main():
     if args.fix:
       raise RuntimeError("Cannot fix broken images without Google API keys")
 
-  # Fetch figures
+  # Fetch figures. The --name path asks Firestore for the one matching
+  # document; the full path streams the collection lazily so only the
+  # bounded in-flight window is ever held in memory
+  figures = None  # None means "stream everything"
   if args.name:
-    # Check specific figure
     print(f"Fetching figure: {args.name}...")
-    all_figures = get_all_figures()
-    figures = [f for f in all_figures if f.get("name") == args.name]
-    if not figures:
+    figure = get_figure_by_name(args.name)
+    if not figure:
       print(f"❌ Figure '{args.name}' not found in database")
       return
+    figures = [figure]
     print(f"Found figure: {args.name}\n")
   else:
-    # Check all figures
-    print("Fetching all figures from database...")
-    figures = get_all_figures()
-    print(f"Found {len(figures)} figures in database\n")
-
-  if not figures:
-    print("No figures found. Exiting.")
-    return
+    print("Streaming figures from database...")
 
   # Validation results (streaming approach - fix immediately when found)
   valid_count = 0
@@ -348,46 +448,134 @@ def main():
   # Validate each figure (parallel execution)
   show_index = not args.name
   print(f"Validating figures with {args.workers} parallel workers...\n")
-
-  with ThreadPoolExecutor(max_workers=args.workers) as executor:
-    # Submit all tasks
-    future_to_figure = {
-      executor.submit(
-        process_figure, figure, i + 1, len(figures), args, show_index
-      ): figure
-      for i, figure in enumerate(figures)
+  _log_listener.start()
+
+  # Load the validity cache as a read-only snapshot for the workers (shelve
+  # itself is not thread-safe); writes happen on this thread only
+  validity_db = shelve.open(VALIDITY_CACHE_PATH)
+  known_valid: Set[str] = set()
+  if not args.force_revalidate:
+    fresh_after = time.time() - VALIDITY_CACHE_TTL_SECONDS
+    known_valid = {
+      entry["url"]
+      for entry in validity_db.values()
+      if entry.get("ts", 0) >= fresh_after
     }
+  if known_valid:
+    print(f"Validity cache: {len(known_valid)} URLs verified within the last 7 days")
 
-    # Process results as they complete
-    for future in as_completed(future_to_figure):
-      result = future.result()
+  # Drive the validation from one event loop: a producer feeds figures
+  # into a bounded queue (pulling each document off the Firestore stream
+  # in a thread) and --workers consumer tasks validate them via
+  # to_thread, so memory stays O(workers) rather than O(collection)
+  total = len(figures) if figures is not None else None
 
-      # Update counters
-      if result["is_valid"]:
-        valid_count += 1
-      else:
-        invalid_count += 1
-
-      if result["fixed"]:
-        fixed_count += 1
-      if result["fix_failed"]:
-        failed_to_fix_count += 1
-        # Store details for later display
-        failed_fixes.append({
-          "name": result["name"],
-          "reason": result["fix_failure_reason"],
-          "original_url": result["original_image_url"],
-          "missing_fields": result["issues"]["missing_fields"],
-          "image_status": result["issues"]["image_status"],
-        })
+  # Fixed figures are staged here and committed in WriteBatches, so F
+  # fixes cost ceil(F/500) write round-trips instead of one each
+  pending_saves: List[Dict[str, Any]] = []
+
+  def flush_saves() -> None:
+    if not pending_saves or not db:
+      return
+    batch = db.batch()
+    for fig in pending_saves:
+      save_figure(fig, generate_embeddings=False, batch=batch)
+    batch.commit()
+    thread_safe_print(f"Committed {len(pending_saves)} fixed figures")
+    pending_saves.clear()
+
+  def record_result(result: Dict[str, Any]) -> None:
+    """Fold one finished result into the counters and caches.
+
+    Results are consumed as they complete rather than collected, so a
+    full-collection run never holds more than the in-flight window.
+    Runs on the event-loop (main) thread, which also makes the shelve
+    write safe without locking.
+    """
+    nonlocal valid_count, invalid_count, fixed_count, failed_to_fix_count
+    if result["validated_url"]:
+      validity_db[_validity_cache_key(result["validated_url"])] = {
+        "url": result["validated_url"],
+        "ts": time.time(),
+      }
+    if result["is_valid"]:
+      valid_count += 1
+    else:
+      invalid_count += 1
+
+    if result["fixed"]:
+      fixed_count += 1
+      if result["fixed_figure"] is not None:
+        pending_saves.append(result["fixed_figure"])
+        if len(pending_saves) >= FIRESTORE_BATCH_LIMIT:
+          flush_saves()
+    if result["fix_failed"]:
+      failed_to_fix_count += 1
+      # Store details for later display
+      failed_fixes.append({
+        "name": result["name"],
+        "reason": result["fix_failure_reason"],
+        "original_url": result["original_image_url"],
+        "missing_fields": result["issues"]["missing_fields"],
+        "image_status": result["issues"]["image_status"],
+      })
+
+  async def _validate_all():
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=args.workers))
+    work_queue: asyncio.Queue = asyncio.Queue(maxsize=args.workers * 2)
+
+    async def producer():
+      source = iter(figures) if figures is not None else iter_all_figures()
+      index = 0
+      while True:
+        fig = await asyncio.to_thread(next, source, None)
+        if fig is None:
+          break
+        index += 1
+        await work_queue.put((index, fig))
+      for _ in range(args.workers):
+        await work_queue.put(None)
+
+    async def consume():
+      while True:
+        item = await work_queue.get()
+        if item is None:
+          return
+        index, fig = item
+        record_result(
+          await asyncio.to_thread(
+            process_figure, fig, index, total, args, show_index, known_valid
+          )
+        )
+
+    await asyncio.gather(producer(), *(consume() for _ in range(args.workers)))
+
+  if figures is not None and len(figures) == 1:
+    # One figure (the --name path): call it inline instead of spinning up
+    # an event loop and thread pool for a single task
+    record_result(process_figure(figures[0], 1, 1, args, show_index, known_valid))
+  else:
+    asyncio.run(_validate_all())
+
+  flush_saves()
+
+  # Drain any queued log lines before the summary prints directly
+  _log_listener.stop()
+  validity_db.close()
+
+  total_processed = valid_count + invalid_count
+  if total_processed == 0:
+    print("No figures found. Exiting.")
+    return
 
   # Print summary
   print("=" * 60)
   print("Validation Summary")
   print("=" * 60)
-  print(f"Total figures:   {len(figures)}")
-  print(f"Valid:           {valid_count} ({valid_count / len(figures) * 100:.1f}%)")
-  print(f"Invalid:         {invalid_count} ({invalid_count / len(figures) * 100:.1f}%)")
+  print(f"Total figures:   {total_processed}")
+  print(f"Valid:           {valid_count} ({valid_count / total_processed * 100:.1f}%)")
+  print(f"Invalid:         {invalid_count} ({invalid_count / total_processed * 100:.1f}%)")
 
   if args.fix:
     print()
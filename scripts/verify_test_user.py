@@ -7,10 +7,21 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from google.cloud.firestore_v1.base_query import FieldFilter
+
 from backend.database import db
 
 TEST_USER_ID = "test-user-puppeteer-001"
 
+# Firestore allows up to 500 operations per batch commit
+FIRESTORE_BATCH_LIMIT = 500
+
+
+def _test_user_query():
+  return db.collection("user_searches").where(
+    filter=FieldFilter("user_id", "==", TEST_USER_ID)
+  )
+
 
 def get_search_count():
   """Get number of searches for test user."""
@@ -18,9 +29,10 @@ def get_search_count():
     print("[ERROR] Database not available")
     return -1
 
-  docs = db.collection("user_searches").where("user_id", "==", TEST_USER_ID).stream()
-  count = sum(1 for _ in docs)
-  return count
+  # Server-side aggregation: one response instead of streaming every doc
+  # just to count it
+  result = _test_user_query().count().get()
+  return int(result[0][0].value)
 
 
 def clear_searches():
@@ -29,11 +41,21 @@ def clear_searches():
     print("[ERROR] Database not available")
     return 0
 
-  docs = db.collection("user_searches").where("user_id", "==", TEST_USER_ID).stream()
+  # Id-only projection (no field payloads) and batched deletes: N docs
+  # cost ceil(N/500) commits instead of one delete RPC each
+  batch = db.batch()
+  pending = 0
   deleted = 0
-  for doc in docs:
-    doc.reference.delete()
+  for doc in _test_user_query().select([]).stream():
+    batch.delete(doc.reference)
+    pending += 1
     deleted += 1
+    if pending >= FIRESTORE_BATCH_LIMIT:
+      batch.commit()
+      batch = db.batch()
+      pending = 0
+  if pending:
+    batch.commit()
   return deleted
 
 
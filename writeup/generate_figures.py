@@ -6,6 +6,8 @@ This script generates:
 2. Screenshots of the application (requires running backend + frontend)
 """
 
+import asyncio
+import hashlib
 import subprocess
 import sys
 from pathlib import Path
@@ -21,9 +23,21 @@ def generate_probability_plot(output_path: Path) -> None:
   k_min = 2
   k_max = 7
 
+  # Skip the matplotlib render when the existing file was produced from
+  # the same parameters; the sidecar records what went into it
+  params_hash = hashlib.sha1(f"{lambda_decay}-{k_min}-{k_max}".encode()).hexdigest()
+  hash_path = output_path.with_suffix(".hash")
+  if (
+    output_path.exists() and hash_path.exists() and hash_path.read_text() == params_hash
+  ):
+    print(f"Up to date: {output_path}")
+    return
+
   k_values = np.arange(k_min, k_max + 1)
-  # P(k) ∝ exp(-λ * (k - k_min))
-  raw_probs = np.exp(-lambda_decay * (k_values - k_min))
+  # P(k) = softmax(-λ * (k - k_min)): subtract the max logit before
+  # exponentiating so a larger k_max range can't overflow exp
+  logits = -lambda_decay * (k_values - k_min)
+  raw_probs = np.exp(logits - logits.max())
   probabilities = raw_probs / raw_probs.sum()
 
   fig, ax = plt.subplots(figsize=(4, 2.5))
@@ -52,6 +66,7 @@ def generate_probability_plot(output_path: Path) -> None:
   plt.tight_layout()
   plt.savefig(output_path, dpi=300, bbox_inches="tight")
   plt.close()
+  hash_path.write_text(params_hash)
   print(f"Generated: {output_path}")
 
 
@@ -64,7 +79,7 @@ def generate_screenshots(output_dir: Path) -> None:
   - Playwright installed: uv add playwright && uv run playwright install chromium
   """
   try:
-    from playwright.sync_api import sync_playwright
+    from playwright.async_api import async_playwright
   except ImportError:
     print(
       "Playwright not installed. Run: uv add playwright && uv run playwright install chromium"
@@ -72,68 +87,91 @@ def generate_screenshots(output_dir: Path) -> None:
     return
 
   frontend_url = "http://localhost:5173"
+  sample_text = "I'm a queer Latina interested in neuroscience from Georgia"
 
-  with sync_playwright() as p:
-    browser = p.chromium.launch()
+  # The three screenshots each rebuild their own state from a fresh page,
+  # so they run in parallel contexts sharing one browser process: total
+  # wall time is the slowest capture (the results wait) instead of the sum
+
+  async def _new_page(browser):
     # MacBook resolution (1440x900) with 2x scale for retina quality
-    page = browser.new_page(
+    page = await browser.new_page(
       viewport={"width": 1440, "height": 900},
       device_scale_factor=2,
     )
+    await page.goto(frontend_url, timeout=10000)
+    await page.wait_for_load_state("networkidle", timeout=10000)
+    return page
+
+  async def shot_initial(browser):
+    # Screenshot 1: Initial chat interface
+    page = await _new_page(browser)
+
+    # Wait a moment for any animations to settle
+    await page.wait_for_timeout(500)
+
+    screenshot_path = output_dir / "screenshot_chat.png"
+    await page.screenshot(path=str(screenshot_path))
+    print(f"Generated: {screenshot_path}")
+
+  async def shot_filled(browser):
+    # Screenshot 2: Enter sample text to show the interface with input
+    page = await _new_page(browser)
+    textarea = page.locator("textarea").first
+    if await textarea.is_visible():
+      await textarea.fill(sample_text)
+      await page.wait_for_timeout(300)
+
+      screenshot_path = output_dir / "screenshot_chat_filled.png"
+      await page.screenshot(path=str(screenshot_path))
+      print(f"Generated: {screenshot_path}")
 
+  async def shot_results(browser):
+    # Screenshot 3: Submit the form and wait for actual results
+    page = await _new_page(browser)
+    textarea = page.locator("textarea").first
+    if not await textarea.is_visible():
+      return
+    await textarea.fill(sample_text)
+
+    submit_button = page.locator("button:has-text('Begin Journey')")
+    if not await submit_button.is_visible():
+      return
+    await submit_button.click()
+
+    # Wait for results view to appear (up to 120 seconds for discovery)
+    print("Waiting for results view (this may take up to 120 seconds)...")
     try:
-      # Screenshot 1: Initial chat interface
-      page.goto(frontend_url, timeout=10000)
-      page.wait_for_load_state("networkidle", timeout=10000)
+      # Wait for the results view - look for "Your search:" text which only appears on results page
+      await page.wait_for_selector("text=Your search:", timeout=120000)
 
-      # Wait a moment for any animations to settle
-      page.wait_for_timeout(500)
+      # Then wait for actual result rows to load
+      await page.wait_for_selector(".fade-in", timeout=120000)
+      await page.wait_for_timeout(2000)  # Let animations settle
 
-      screenshot_path = output_dir / "screenshot_chat.png"
-      page.screenshot(path=str(screenshot_path))
+      screenshot_path = output_dir / "screenshot_results.png"
+      await page.screenshot(path=str(screenshot_path))
       print(f"Generated: {screenshot_path}")
-
-      # Screenshot 2: Enter sample text to show the interface with input
-      sample_text = "I'm a queer Latina interested in neuroscience from Georgia"
-      textarea = page.locator("textarea").first
-      if textarea.is_visible():
-        textarea.fill(sample_text)
-        page.wait_for_timeout(300)
-
-        screenshot_path = output_dir / "screenshot_chat_filled.png"
-        page.screenshot(path=str(screenshot_path))
-        print(f"Generated: {screenshot_path}")
-
-      # Screenshot 3: Submit the form and wait for actual results
-      submit_button = page.locator("button:has-text('Begin Journey')")
-      if submit_button.is_visible():
-        submit_button.click()
-
-        # Wait for results view to appear (up to 120 seconds for discovery)
-        print("Waiting for results view (this may take up to 120 seconds)...")
-        try:
-          # Wait for the results view - look for "Your search:" text which only appears on results page
-          page.wait_for_selector("text=Your search:", timeout=120000)
-
-          # Then wait for actual result rows to load
-          page.wait_for_selector(".fade-in", timeout=120000)
-          page.wait_for_timeout(2000)  # Let animations settle
-
-          screenshot_path = output_dir / "screenshot_results.png"
-          page.screenshot(path=str(screenshot_path))
-          print(f"Generated: {screenshot_path}")
-        except Exception as e:
-          print(f"Timeout waiting for results: {e}")
-          # Take a screenshot anyway to see current state
-          screenshot_path = output_dir / "screenshot_results_partial.png"
-          page.screenshot(path=str(screenshot_path))
-          print(f"Generated partial results: {screenshot_path}")
-
     except Exception as e:
-      print(f"Could not capture screenshots: {e}")
-      print("Make sure frontend is running: cd frontend && npm run dev")
-
-    browser.close()
+      print(f"Timeout waiting for results: {e}")
+      # Take a screenshot anyway to see current state
+      screenshot_path = output_dir / "screenshot_results_partial.png"
+      await page.screenshot(path=str(screenshot_path))
+      print(f"Generated partial results: {screenshot_path}")
+
+  async def _run():
+    async with async_playwright() as p:
+      browser = await p.chromium.launch()
+      try:
+        await asyncio.gather(
+          shot_initial(browser), shot_filled(browser), shot_results(browser)
+        )
+      except Exception as e:
+        print(f"Could not capture screenshots: {e}")
+        print("Make sure frontend is running: cd frontend && npm run dev")
+      await browser.close()
+
+  asyncio.run(_run())
 
 
 def main():